@@ -1,14 +1,24 @@
+import asyncio
+import collections
+import hashlib
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from dotenv import load_dotenv
 
 # Import our custom modules
 from research_agent.planner import ResearchPlannerAgent, ResearchPlannerError
-from research_agent.search import WebSearchAgent
+from research_agent.client import create_async_client
+from research_agent.search import WebSearchAgent, group_results_by_source
 from research_agent.decision import DecisionAgent, DecisionModuleError
 from research_agent.report import ReportGeneratorAgent, ReportGeneratorError
 from research_agent.triage import TriageAgent, TriageAgentError
+from research_agent.models import ResearchDecision, SearchContext
+from research_agent.queue import PriorityQueue
 
 # Load environment variables
 load_dotenv()
@@ -18,51 +28,481 @@ st.set_page_config(page_title='Research Agent', layout='wide')
 st.title('Research Agent Demo')
 st.header('Powered by OpenAI Responses API with web search')
 
-# Initialize session state variables if they don't exist
-if 'research_plan' not in st.session_state:
-	st.session_state.research_plan = None
-if 'research_summaries' not in st.session_state:
-	st.session_state.research_summaries = []
-if 'final_report' not in st.session_state:
-	st.session_state.final_report = None
-if 'research_complete' not in st.session_state:
-	st.session_state.research_complete = False
-if 'current_step' not in st.session_state:
-	st.session_state.current_step = 0
-if 'error_message' not in st.session_state:
-	st.session_state.error_message = None
-if 'previous_gaps' not in st.session_state:
-	st.session_state.previous_gaps = []
-if 'gap_questions' not in st.session_state:
-	st.session_state.gap_questions = []
-if 'iteration_count' not in st.session_state:
-	st.session_state.iteration_count = 0
-if 'max_iterations' not in st.session_state:
-	st.session_state.max_iterations = 3  # Maximum number of gap-filling iterations
-if 'active_research_queue' not in st.session_state:
-	st.session_state.active_research_queue = []
-if 'current_research_context' not in st.session_state:
-	st.session_state.current_research_context = None
-if 'research_queue' not in st.session_state:
-	st.session_state.research_queue = []
-if 'current_iteration' not in st.session_state:
-	st.session_state.current_iteration = 0
-if 'research_context' not in st.session_state:
-	st.session_state.research_context = {}
-if 'conversation_history' not in st.session_state:
-	st.session_state.conversation_history = []
-if 'triage_status' not in st.session_state:
-	st.session_state.triage_status = None
-if 'skip_gaps' not in st.session_state:
-	st.session_state.skip_gaps = False
+# Initialize session state variables if they don't exist. The defaults are rebuilt on every
+# run, so the mutable ones are never shared between sessions
+SESSION_DEFAULTS = {
+	'research_plan': None,
+	'research_summaries': [],
+	'summaries_by_iteration': {},  # Iteration -> summaries, kept in sync on append
+	'final_report': None,
+	'report_job': None,  # Report being generated in the background
+	'research_complete': False,
+	'current_step': 0,
+	'error_message': None,
+	'warning_message': None,  # Notice shown once, like error_message, but not an error
+	'previous_gaps': [],
+	'gap_questions': [],
+	'iteration_count': 0,
+	'max_iterations': 3,  # Maximum number of gap-filling iterations
+	'active_research_queue': [],
+	'current_research_context': None,
+	'research_queue': PriorityQueue(),
+	'current_iteration': 0,
+	'decision_state': {},  # Covered aspects and open gaps from the last decision
+	'last_evaluated_index': 0,  # Summaries before this index were already evaluated
+	'research_state': 'idle',  # 'iterating' while research runs, one iteration per rerun
+	'progress_fraction': 0.0,
+	'research_context': {},
+	'conversation_history': [],
+	'triage_status': None,
+	'skip_gaps': False,
+	'batch_summaries': False,
+	'seen_questions': set(),  # Normalized questions already queued or researched
+	'question_embeddings': {},  # Normalized question -> embedding vector
+	'show_research_plan': True,
+	'show_research_progress': True,
+}
+for key, value in SESSION_DEFAULTS.items():
+	st.session_state.setdefault(key, value)
+
+
+# Stateless agent components are created once per process and shared across reruns
+@st.cache_resource
+def get_planner():
+	return ResearchPlannerAgent()
+
+
+@st.cache_resource
+def get_search_module():
+	return WebSearchAgent()
+
+
+@st.cache_resource
+def get_decision_module():
+	return DecisionAgent()
+
+
+@st.cache_resource
+def get_report_generator():
+	return ReportGeneratorAgent()
+
 
 # Initialize our agent components
-planner = ResearchPlannerAgent()
-search_module = WebSearchAgent()
-decision_module = DecisionAgent()
-report_generator = ReportGeneratorAgent()
+planner = get_planner()
+search_module = get_search_module()
+decision_module = get_decision_module()
+report_generator = get_report_generator()
+# The triage agent keeps per-conversation history, so it must not be shared between sessions
 triage_agent = TriageAgent()
 
+# Maximum number of research tasks searched and summarized at the same time
+MAX_CONCURRENT_TASKS = 8
+
+# Threads available for generating reports in the background
+MAX_REPORT_WORKERS = 4
+
+# How often a report being generated is polled for new text, in seconds
+REPORT_POLL_INTERVAL = 0.5
+
+# Minimum time between re-renders of a summary being streamed, in seconds
+STREAM_UPDATE_INTERVAL = 0.1
+
+# Number of questions summarized per API call when batched summaries are enabled
+SUMMARY_BATCH_SIZE = 5
+
+# How long cached LLM results are reused, in seconds
+CACHE_TTL = 24 * 60 * 60
+
+# Number of LLM results kept in memory across sessions, least recently used evicted first
+LLM_CACHE_SIZE = 128
+
+# How long search and summary results are kept in the disk cache, in seconds
+DISK_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Gaps at least this similar to a queued or researched question are treated as duplicates
+GAP_SIMILARITY_THRESHOLD = 0.92
+
+
+def cache_key(*parts):
+	"""Build a stable cache key from JSON-serializable parts."""
+	return hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS, default=str)).hexdigest()
+
+
+def api_key_hash(api_key):
+	"""Hash the API key so it can be part of a cache key without being stored."""
+	return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+@st.cache_resource(ttl=CACHE_TTL)
+def llm_result_cache():
+	"""Process-wide LRU store for LLM results that st.cache_data cannot wrap (async and streamed calls)."""
+	return collections.OrderedDict()
+
+
+@st.cache_resource
+def llm_result_cache_lock():
+	"""Lock guarding the LRU order of llm_result_cache, which every session's thread updates."""
+	return threading.Lock()
+
+
+def recall_result(key):
+	"""Return an LLM result from memory, or None, marking it as recently used."""
+	store = llm_result_cache()
+	with llm_result_cache_lock():
+		if key not in store:
+			return None
+		store.move_to_end(key)
+		return store[key]
+
+
+def remember_result(key, value):
+	"""Keep an LLM result in memory, evicting the least recently used ones beyond LLM_CACHE_SIZE."""
+	store = llm_result_cache()
+	with llm_result_cache_lock():
+		store[key] = value
+		store.move_to_end(key)
+		while len(store) > LLM_CACHE_SIZE:
+			store.popitem(last=False)
+
+
+@st.cache_resource
+def disk_cache():
+	"""Persistent cache for search and summary results that survives process restarts."""
+	# Imported on first use, so page loads that never run research don't pay for it
+	import diskcache
+
+	return diskcache.Cache('.research_cache')
+
+
+def get_cached_result(key):
+	"""Look up a cached LLM result in memory first, then on disk."""
+	value = recall_result(key)
+	if value is not None:
+		return value
+	value = disk_cache().get(key)
+	if value is not None:
+		remember_result(key, value)
+	return value
+
+
+def set_cached_result(key, value):
+	"""Cache an LLM result in memory and on disk."""
+	remember_result(key, value)
+	disk_cache().set(key, value, expire=DISK_CACHE_TTL)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_create_plan(topic, clarification, key_hash, _api_key):
+	"""Create a research plan, reusing the plan for an identical topic and clarification."""
+	return planner.create_plan(topic, _api_key, clarification=clarification)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_triage_query(query, key_hash, _api_key):
+	"""Triage a new query, reusing the decision for an identical query."""
+	# A fresh agent, so no conversation history leaks into the cached decision
+	return TriageAgent().triage_query(query, _api_key)
+
+
+def normalize_question(question):
+	"""Normalize a question for duplicate detection."""
+	return question.strip().casefold()
+
+
+def embed_questions(questions, api_key):
+	"""Return an embedding matrix for the normalized questions, embedding only new ones."""
+	# Imported on first use, it's only needed once research produces gaps
+	import numpy as np
+
+	embeddings = st.session_state.question_embeddings
+	missing = [question for question in questions if question not in embeddings]
+	if missing:
+		embeddings.update(zip(missing, search_module.embed(missing, api_key)))
+	return np.array([embeddings[question] for question in questions], dtype=np.float32)
+
+
+def new_gap_questions(gaps, api_key):
+	"""Filter out gaps that repeat or paraphrase a question that was already queued or researched."""
+	import numpy as np
+
+	seen = st.session_state.seen_questions
+
+	# Exact duplicates, after normalization
+	fresh = {}
+	for gap in gaps:
+		normalized = normalize_question(gap)
+		if normalized and normalized not in seen:
+			fresh.setdefault(normalized, gap)
+	if not fresh:
+		return []
+
+	# Near duplicates, by cosine similarity of the (unit-length) embeddings
+	seen_questions = list(seen)
+	try:
+		vectors = embed_questions(seen_questions + list(fresh), api_key)
+	except Exception as e:
+		st.warning(f'Could not compare research gaps semantically: {str(e)}')
+		return list(fresh.values())
+
+	accepted = []
+	known = vectors[: len(seen_questions)]
+	for vector, gap in zip(vectors[len(seen_questions) :], fresh.values()):
+		if len(known) and (known @ vector).max() > GAP_SIMILARITY_THRESHOLD:
+			continue
+		accepted.append(gap)
+		known = np.vstack([known, vector])
+	return accepted
+
+
+def evaluate_research(api_key):
+	"""Decide whether research is complete from the summaries added since the last evaluation.
+
+	The decision and the state carried to the next evaluation are reused for an identical set of
+	summaries.
+	"""
+	summaries = st.session_state.research_summaries
+
+	key = cache_key(
+		'incremental_decision',
+		st.session_state.research_topic,
+		[(summary['task'], summary['summary']) for summary in summaries],
+		api_key_hash(api_key),
+	)
+	cached = get_cached_result(key)
+	if cached is None:
+		decision, state = decision_module.is_research_complete_incremental(
+			st.session_state.decision_state,
+			summaries[st.session_state.last_evaluated_index :],
+			st.session_state.research_topic,
+			api_key,
+		)
+		# Stored as a plain dict, so cache entries don't depend on the model's pickled layout
+		cached = {'decision': decision.model_dump(), 'state': state}
+		set_cached_result(key, cached)
+
+	st.session_state.decision_state = cached['state']
+	st.session_state.last_evaluated_index = len(summaries)
+	# The dict was dumped from a validated decision, so it is rebuilt without validating it again
+	return ResearchDecision.model_construct(**cached['decision'])
+
+
+def record_summary(summary):
+	"""Store a research summary and index it by iteration for the progress display."""
+	st.session_state.research_summaries.append(summary)
+	st.session_state.summaries_by_iteration.setdefault(summary['iteration'], []).append(summary)
+
+
+@st.cache_resource
+def report_executor():
+	"""Worker threads that generate reports off the Streamlit script thread."""
+	return ThreadPoolExecutor(max_workers=MAX_REPORT_WORKERS)
+
+
+def collect_report(chunks, topic, research_plan, research_summaries, api_key):
+	"""Stream a report into the shared chunk list and return its full text. Runs on a worker thread."""
+	for chunk in report_generator.stream_report(topic, research_plan, research_summaries, api_key):
+		chunks.append(chunk)
+	return ''.join(chunks)
+
+
+def start_final_report(api_key):
+	"""Start generating the final report in the background, unless it is already cached."""
+	key = cache_key(
+		'report',
+		st.session_state.research_topic,
+		st.session_state.research_plan.model_dump(),
+		st.session_state.research_summaries,
+		api_key_hash(api_key),
+	)
+	report = recall_result(key)
+	if report is not None:
+		st.session_state.final_report = report
+		return
+
+	# The worker only sees plain arguments, session state is not available off the script thread
+	chunks = []
+	future = report_executor().submit(
+		collect_report,
+		chunks,
+		st.session_state.research_topic,
+		st.session_state.research_plan,
+		list(st.session_state.research_summaries),
+		api_key,
+	)
+	st.session_state.report_job = {'key': key, 'chunks': chunks, 'future': future}
+
+
+@st.fragment(run_every=REPORT_POLL_INTERVAL)
+def report_progress():
+	"""Show the report generated so far, polling the background job until it finishes."""
+	job = st.session_state.report_job
+	if job is None:
+		return
+
+	if not job['future'].done():
+		report = ''.join(list(job['chunks']))
+		if report:
+			st.markdown(report)
+		else:
+			st.info('Generating report...')
+		return
+
+	st.session_state.report_job = None
+	try:
+		report = job['future'].result()
+	except ReportGeneratorError as e:
+		st.session_state.error_message = f'Failed to generate report: {str(e)}'
+		st.session_state.research_complete = False  # Let the report be requested again
+	except Exception as e:
+		st.session_state.error_message = f'Error generating report: {str(e)}'
+		st.session_state.research_complete = False
+	else:
+		remember_result(job['key'], report)
+		st.session_state.final_report = report
+	st.rerun()
+
+
+def summary_cache_key(task, search_context, search_response, key_hash):
+	"""Build the cache key for the summary of a task's search results."""
+	return cache_key(
+		'summary',
+		task['question'],
+		search_context.model_dump(),
+		[result.model_dump(exclude={'accessed_date'}) for result in search_response.results],
+		key_hash,
+	)
+
+
+async def search_task(task, api_key, base_context, client):
+	"""Search a single research task, unless the same question was already searched."""
+	# Only the subtopic differs between the tasks of one iteration
+	search_context = base_context.model_copy(update={'current_subtopic': task['topic']})
+
+	search_key = cache_key(
+		'search',
+		normalize_question(task['question']),
+		base_context.research_topic,
+		task['topic'],
+		api_key_hash(api_key),
+	)
+	search_response = get_cached_result(search_key)
+	if search_response is None:
+		search_response = await search_module.asearch(
+			task['question'],
+			api_key,
+			context=search_context,
+			client=client,
+		)
+		set_cached_result(search_key, search_response)
+
+	return search_context, search_response
+
+
+async def research_task(task, placeholder, api_key, base_context, semaphore, client):
+	"""Search and summarize a single research task, streaming the summary into the placeholder."""
+	async with semaphore:
+		search_context, search_response = await search_task(task, api_key, base_context, client)
+
+		# Summarize findings, unless the same results were already summarized
+		summary_key = summary_cache_key(task, search_context, search_response, api_key_hash(api_key))
+		summary = get_cached_result(summary_key)
+		if summary is None:
+			parts = []
+			last_update = 0.0
+			async for delta in search_module.astream_summarize(
+				search_response.results,
+				task['question'],
+				api_key,
+				context=search_context,
+				client=client,
+			):
+				parts.append(delta)
+				# Re-render at most every STREAM_UPDATE_INTERVAL, the final text replaces it anyway
+				now = time.monotonic()
+				if now - last_update >= STREAM_UPDATE_INTERVAL:
+					placeholder.markdown(''.join(parts))
+					last_update = now
+			summary = ''.join(parts).strip()
+			set_cached_result(summary_key, summary)
+
+	return task, search_response, summary
+
+
+async def batched_research(tasks, api_key, base_context, semaphore, client):
+	"""Search every task concurrently, then summarize the results SUMMARY_BATCH_SIZE questions per call."""
+	key_hash = api_key_hash(api_key)
+
+	async def bounded_search(task):
+		async with semaphore:
+			return await search_task(task, api_key, base_context, client)
+
+	searched = await asyncio.gather(*(bounded_search(task) for task in tasks))
+
+	summary_keys = [
+		summary_cache_key(task, search_context, search_response, key_hash)
+		for task, (search_context, search_response) in zip(tasks, searched)
+	]
+	summaries = [get_cached_result(key) for key in summary_keys]
+
+	# Only the questions without a cached summary are sent to the model
+	pending = [i for i, summary in enumerate(summaries) if summary is None]
+	chunks = [pending[i : i + SUMMARY_BATCH_SIZE] for i in range(0, len(pending), SUMMARY_BATCH_SIZE)]
+
+	async def summarize_chunk(chunk):
+		async with semaphore:
+			return await search_module.abatch_summarize(
+				[(searched[i][1].results, tasks[i]['question'], searched[i][0]) for i in chunk],
+				api_key,
+				client=client,
+			)
+
+	chunk_summaries = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+	for chunk, batch in zip(chunks, chunk_summaries):
+		for i, summary in zip(chunk, batch):
+			summaries[i] = summary
+			set_cached_result(summary_keys[i], summary)
+
+	return [
+		(task, search_response, summary)
+		for task, (_, search_response), summary in zip(tasks, searched, summaries)
+	]
+
+
+async def research_batch(tasks, placeholders, api_key, research_topic, iteration):
+	"""Run all research tasks concurrently, bounded by MAX_CONCURRENT_TASKS.
+
+	Yields (placeholder, (task, search_response, summary)) pairs in completion order, so a
+	fast task is shown without waiting for the slowest one.
+	"""
+	semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+
+	# Prepare search context with only relevant information, shared by the whole iteration
+	base_context = SearchContext(research_topic=research_topic, iteration=iteration)
+
+	# One client for the whole iteration, closed before asyncio.run() closes its event loop
+	async with create_async_client(api_key) as client:
+		if st.session_state.batch_summaries:
+			# Batched summaries finish together, so there is no completion order to follow
+			results = await batched_research(tasks, api_key, base_context, semaphore, client)
+			for placeholder, result in zip(placeholders, results):
+				yield placeholder, result
+			return
+
+		async def run(task, placeholder):
+			return placeholder, await research_task(
+				task, placeholder, api_key, base_context, semaphore, client
+			)
+
+		futures = [asyncio.create_task(run(task, placeholder)) for task, placeholder in zip(tasks, placeholders)]
+		try:
+			for future in asyncio.as_completed(futures):
+				yield await future
+		finally:
+			# Don't leave tasks running on a closed client if one of them failed
+			for future in futures:
+				future.cancel()
+
+
 # Sidebar for API key input and display controls
 with st.sidebar:
 	st.header('Configuration')
@@ -71,11 +511,6 @@ with st.sidebar:
 	)
 
 	st.header('Display Settings')
-	# Initialize display settings in session state if they don't exist
-	if 'show_research_plan' not in st.session_state:
-		st.session_state.show_research_plan = True
-	if 'show_research_progress' not in st.session_state:
-		st.session_state.show_research_progress = True
 
 	# Create callback functions for the toggles
 	def toggle_research_plan():
@@ -109,6 +544,12 @@ with st.sidebar:
 		value=st.session_state.skip_gaps,
 		help='When enabled, the research will proceed without gap analysis'
 	)
+	# Add toggle for batching summaries
+	st.session_state.batch_summaries = st.toggle(
+		'Batch Summaries',
+		value=st.session_state.batch_summaries,
+		help=f'When enabled, up to {SUMMARY_BATCH_SIZE} questions are summarized per API call instead of streaming each summary'
+	)
 	
 	st.markdown('---')
 	st.header('Research Controls')
@@ -116,11 +557,17 @@ with st.sidebar:
 	if st.button('Reset Research'):
 		st.session_state.research_plan = None
 		st.session_state.research_summaries = []
+		st.session_state.summaries_by_iteration = {}
+		st.session_state.decision_state = {}
+		st.session_state.last_evaluated_index = 0
 		st.session_state.final_report = None
+		st.session_state.report_job = None
 		st.session_state.research_complete = False
 		st.session_state.current_step = 0
 		st.session_state.error_message = None
+		st.session_state.warning_message = None
 		st.session_state.previous_gaps = []
+		st.session_state.seen_questions = set()
 		st.session_state.gap_questions = []
 		st.session_state.iteration_count = 0
 		st.session_state.conversation_history = []
@@ -131,8 +578,10 @@ with st.sidebar:
 		# Add missing state resets
 		st.session_state.active_research_queue = []
 		st.session_state.current_research_context = None
-		st.session_state.research_queue = []
+		st.session_state.research_queue = PriorityQueue()
 		st.session_state.current_iteration = 0
+		st.session_state.research_state = 'idle'
+		st.session_state.progress_fraction = 0.0
 		st.rerun()
 
 	# Add the Skip Gaps button, only show it when research is in progress
@@ -146,17 +595,11 @@ with st.sidebar:
 					st.error('Please provide your OpenAI API key in the sidebar.')
 					st.rerun()
 
-				with st.spinner('Generating final report with current findings...'):
-					st.session_state.final_report = report_generator.generate_report(
-						st.session_state.research_topic,
-						st.session_state.research_plan,
-						st.session_state.research_summaries,
-						openai_api_key,
-					)
-					st.session_state.research_complete = True
-					st.session_state.research_queue = []  # Clear the research queue
-					st.success('Report generated successfully!')
-					st.rerun()
+				# Generate the report in the background; it is shown in the main area
+				start_final_report(openai_api_key)
+				st.session_state.research_complete = True
+				st.session_state.research_queue = PriorityQueue()  # Clear the research queue
+				st.rerun()
 			except Exception as e:
 				st.error(f'Error generating report: {str(e)}')
 				st.session_state.error_message = str(e)
@@ -168,6 +611,11 @@ if st.session_state.error_message:
 	# Clear the error message after displaying it
 	st.session_state.error_message = None
 
+# Display any notices, such as reaching the maximum number of iterations
+if st.session_state.warning_message:
+	st.warning(st.session_state.warning_message)
+	st.session_state.warning_message = None
+
 # Main interface
 st.markdown("Enter a research topic and click 'Start Research' to begin.")
 research_topic = st.text_input('Enter a research topic:', key='topic_input')
@@ -210,14 +658,21 @@ if st.session_state.triage_status == 'needs_clarification':
 						with st.spinner('Creating research plan...'):
 							# Generate research plan with original topic and clarification
 							original_topic = st.session_state.conversation_history[0]['content']
-							st.session_state.research_plan = planner.create_plan(
-								original_topic, openai_api_key, clarification=clarification_response
+							st.session_state.research_plan = cached_create_plan(
+								original_topic,
+								clarification_response,
+								api_key_hash(openai_api_key),
+								openai_api_key,
 							)
 							st.session_state.research_summaries = []
+							st.session_state.summaries_by_iteration = {}
+							st.session_state.decision_state = {}
+							st.session_state.last_evaluated_index = 0
 							st.session_state.final_report = None
 							st.session_state.research_complete = False
 							st.session_state.current_step = 0
 							st.session_state.previous_gaps = []
+							st.session_state.seen_questions = set()
 							st.session_state.gap_questions = []
 							st.session_state.iteration_count = 0
 					elif triage_decision.status == 'invalid':
@@ -249,7 +704,9 @@ else:
 					]
 
 					# Triage the query
-					triage_decision = triage_agent.triage_query(research_topic, openai_api_key)
+					triage_decision = cached_triage_query(
+						research_topic, api_key_hash(openai_api_key), openai_api_key
+					)
 					
 					# Store the full triage decision and status
 					st.session_state.triage_decision = triage_decision
@@ -258,14 +715,18 @@ else:
 					if triage_decision.status == 'valid':
 						with st.spinner('Creating research plan...'):
 							# Generate research plan
-							st.session_state.research_plan = planner.create_plan(
-								research_topic, openai_api_key
+							st.session_state.research_plan = cached_create_plan(
+								research_topic, None, api_key_hash(openai_api_key), openai_api_key
 							)
 							st.session_state.research_summaries = []
+							st.session_state.summaries_by_iteration = {}
+							st.session_state.decision_state = {}
+							st.session_state.last_evaluated_index = 0
 							st.session_state.final_report = None
 							st.session_state.research_complete = False
 							st.session_state.current_step = 0
 							st.session_state.previous_gaps = []
+							st.session_state.seen_questions = set()
 							st.session_state.gap_questions = []
 							st.session_state.iteration_count = 0
 			except TriageAgentError as e:
@@ -278,30 +739,240 @@ else:
 				st.session_state.research_plan = None
 			st.rerun()
 
-# Display research plan if available and enabled
-if st.session_state.research_plan:
-	if st.session_state.show_research_plan:
-		st.subheader('Research Plan')
-		for i, topic in enumerate(st.session_state.research_plan.topics):
-			with st.expander(f'Topic {i + 1}: {topic.title}'):
-				for j, question in enumerate(topic.questions):
-					st.write(f'{j + 1}. {question}')
 
-	# Research control section - always show if we have a plan and research isn't complete
+def build_citations(results):
+	"""Build the citation records stored with a summary, one per source in [N] order."""
+	if not results:
+		return []
+	return [
+		{
+			'title': source_results[0].title,
+			'url': source_results[0].link,
+			'snippet': ' ... '.join(result.snippet for result in source_results),
+			'accessed_date': source_results[0].accessed_date.isoformat(),
+		}
+		for source_results in group_results_by_source(results)
+	]
+
+
+def show_task_result(task, search_response, summary, placeholder):
+	"""Show the summary of a finished research task with its sources and return its summary record."""
+	st.session_state.seen_questions.add(normalize_question(task['question']))
+
+	citations = build_citations(search_response.results)
+
+	# Replace the streamed text with the final summary and its sources
+	with placeholder.container():
+		st.write(summary)
+		if citations:
+			st.markdown("**Sources:**")
+			for citation in citations:
+				st.markdown(f"- [{citation['title']}]({citation['url']})")
+
+	return {
+		'task': f'{task["topic"]}: {task["question"]}',
+		'summary': summary,
+		'citations': citations,
+		'iteration': st.session_state.current_iteration,
+	}
+
+
+def run_research_iteration(openai_api_key):
+	"""Research every queued question once, then decide whether another iteration is needed.
+
+	Runs a single step of the research state machine; the caller reruns the app afterwards so
+	the results are rendered before the next iteration starts.
+
+	Args:
+	    openai_api_key (str): OpenAI API key
+	"""
+	status_container = st.empty()
+
+	# A single container for the latest results, holding one live expander per task
+	latest_results_container = st.empty()
+
+	# Drain the research queue, highest priority first
+	tasks = st.session_state.research_queue.drain()
+	total_tasks = len(tasks)
+	with status_container:
+		st.write(f'Researching {total_tasks} questions concurrently...')
+
+	# Give every task an expander its summary is streamed into
+	with latest_results_container.container():
+		st.markdown("### Latest Research Results")
+		placeholders = [
+			st.expander(
+				f'{task["topic"]}: {task["question"]} (In Progress)', expanded=True
+			).empty()
+			for task in tasks
+		]
+
+	# Queue position of every task, keyed by identity since task dicts aren't hashable
+	positions = {id(task): position for position, task in enumerate(tasks)}
+
+	# Summary records of the finished tasks by queue position. Tasks are shown as they finish,
+	# but stored in queue order, so the summaries don't depend on which one finished first.
+	finished = {}
+
+	async def research_iteration_tasks():
+		done = 0
+		async for placeholder, (task, search_response, summary) in research_batch(
+			tasks,
+			placeholders,
+			openai_api_key,
+			st.session_state.research_topic,
+			st.session_state.current_iteration,
+		):
+			done += 1
+			status_container.progress(done / total_tasks, text=f'Researched {done} of {total_tasks} questions')
+			finished[positions[id(task)]] = show_task_result(task, search_response, summary, placeholder)
+
+	with st.spinner(f'Researching {total_tasks} questions...'):
+		try:
+			# Search and summarize every queued task concurrently, handling each as it finishes
+			asyncio.run(research_iteration_tasks())
+		finally:
+			for position in sorted(finished):
+				record_summary(finished[position])
+
+			# Put failed and unfinished tasks back, so resuming the research retries them
+			for position, task in enumerate(tasks):
+				if position not in finished:
+					st.session_state.research_queue.push(task)
+
+	# Evaluate research completion
+	try:
+		# If skip_gaps is enabled, research is complete without asking the decision model
+		if st.session_state.skip_gaps:
+			decision = ResearchDecision(
+				is_complete=True, reasoning='Gap analysis was skipped.', gaps=[]
+			)
+		else:
+			decision = evaluate_research(openai_api_key)
+
+	except DecisionModuleError as e:
+		st.session_state.error_message = f'Error evaluating research completion: {str(e)}'
+		st.session_state.research_state = 'idle'
+		return
+	except Exception as e:
+		st.session_state.error_message = f'Unexpected error during research evaluation: {str(e)}'
+		st.session_state.research_state = 'idle'
+		return
+
+	# Update research context with latest findings
+	st.session_state.research_context.update({
+		'latest_decision': decision,
+		'total_summaries': len(st.session_state.research_summaries),
+		'current_iteration': st.session_state.current_iteration,
+	})
+
+	if decision.is_complete:
+		st.session_state.research_complete = True
+		st.session_state.research_state = 'idle'
+		status_container.text('Research complete! Generating final report...')
+
+		# Generate final report in the background
+		start_final_report(openai_api_key)
+		return
+
+	# Add new research tasks based on gaps
+	if decision.gaps:
+		for gap in new_gap_questions(decision.gaps, openai_api_key):
+			st.session_state.seen_questions.add(normalize_question(gap))
+			st.session_state.research_queue.push(
+				{
+					'topic': f'Gap Research (Iteration {st.session_state.current_iteration + 1})',
+					'question': gap,
+					'priority': 2,
+					'iteration': st.session_state.current_iteration + 1,
+				}
+			)
+
+	# Increment iteration counter
+	st.session_state.current_iteration += 1
+	st.session_state.progress_fraction = min(
+		(st.session_state.current_iteration + 1) / st.session_state.max_iterations, 1.0
+	)
+
+	# Check if we've reached max iterations
+	if st.session_state.current_iteration >= st.session_state.max_iterations:
+		st.session_state.warning_message = f'Reached maximum research iterations ({st.session_state.max_iterations}). Some gaps may remain.'
+		st.session_state.research_complete = True
+		st.session_state.research_state = 'idle'
+
+
+def render_research_progress():
+	"""Render the research gaps and the summaries collected so far, grouped by iteration."""
+	# Independent of research plan visibility
+	if not st.session_state.research_summaries or not st.session_state.show_research_progress:
+		return
+
+	st.subheader('Research Progress')
+
+	# Create a container for gaps display that will update in real-time
+	gaps_container = st.empty()
+
+	# Display current research gaps if any
+	if 'research_context' in st.session_state and st.session_state.research_context.get('latest_decision'):
+		latest_decision = st.session_state.research_context['latest_decision']
+		with gaps_container:
+			if latest_decision.gaps:
+				st.markdown('### Current Research Gaps')
+				for i, gap in enumerate(latest_decision.gaps, 1):
+					st.markdown(f'**{i}.** {gap}')
+				if latest_decision.reasoning:
+					st.markdown('---')
+					st.markdown('**Decision Reasoning:**')
+					st.markdown(latest_decision.reasoning)
+
+	# Initialize a container for summaries
+	summary_container = st.container()
+
+	# Summaries are grouped by iteration as they are recorded
+	summaries_by_iteration = st.session_state.summaries_by_iteration
+
+	# Display summaries grouped by iteration
+	with summary_container:
+		# Iterations are recorded in ascending order, so insertion order is already sorted
+		for iteration, iteration_summaries in summaries_by_iteration.items():
+			st.markdown(f'**Iteration {iteration + 1}**')
+			for summary in iteration_summaries:
+				with st.expander(f'{summary["task"]}'):
+					st.write(summary['summary'])
+					if summary['citations']:
+						st.markdown('**Sources:**')
+						for citation in summary['citations']:
+							st.markdown(f'- [{citation["title"]}]({citation["url"]})')
+
+
+def rerun_fragment():
+	"""Rerun only the running fragment, or the whole app when the fragment is part of a full run."""
+	try:
+		st.rerun(scope='fragment')
+	except StreamlitAPIException:
+		st.rerun()
+
+
+@st.fragment
+def research_controls(openai_api_key):
+	"""Render the research controls and progress. Clicks in here rerun only this fragment.
+
+	Research runs as a state machine: while research_state is 'iterating', every rerun runs
+	one iteration and then reruns this fragment, which also shows the new summaries. Reruns
+	that reveal results outside the fragment (the final report or an error message) are app-wide.
+	"""
+	iteration_container = None
 	if not st.session_state.research_complete:
 		st.subheader('Research Controls')
 
-		# Initialize research queue if it doesn't exist
-		if not hasattr(st.session_state, 'research_queue'):
-			st.session_state.research_queue = []
-
 		# Show start research button if queue is empty and research hasn't started
 		if not st.session_state.research_queue and not st.session_state.research_summaries:
-			if st.button('Execute Research Plan'):
+			if st.button('Execute Research Plan', key='start_research_plan'):
 				# Initialize the research queue with all questions from the plan
 				for topic in st.session_state.research_plan.topics:
 					for question in topic.questions:
-						st.session_state.research_queue.append(
+						st.session_state.seen_questions.add(normalize_question(question))
+						st.session_state.research_queue.push(
 							{
 								'topic': topic.title,
 								'question': question,
@@ -310,184 +981,16 @@ if st.session_state.research_plan:
 							}
 						)
 
-		# Show continue research button if research is in progress
-		elif st.session_state.research_queue or st.session_state.research_summaries:
+		# Show continue research button if research is in progress, including right after
+		# the queue was initialized above, so that click needs no extra rerun
+		if st.session_state.research_queue or st.session_state.research_summaries:
 			col1, col2 = st.columns(2)
 			with col1:
-				if st.button('Execute Research Plan'):
-					# At the start of research execution, create containers for live updates
-					progress_container = st.empty()
-					status_container = st.empty()
-
-					# Before the research loop starts, create a single container for latest results
-					latest_results_container = st.empty()
-
-					# Create a container for gaps display that will update in real-time
-					gaps_container = st.empty()
-
-					try:
-						while (not st.session_state.research_complete 
-							   and st.session_state.current_iteration < st.session_state.max_iterations):
-							
-							# Update progress display
-							with progress_container:
-								st.progress((st.session_state.current_iteration + 1) / st.session_state.max_iterations)
-								
-							# Process research queue
-							total_tasks = len(st.session_state.research_queue)
-							for task_index, task in enumerate(st.session_state.research_queue[:]):
-								# Update status
-								with status_container:
-									st.write(f'Researching: {task["question"]} ({task_index + 1}/{total_tasks})')
-								
-								current_task = f'{task["topic"]}: {task["question"]}'
-
-								with st.spinner(f'Researching: {task["question"]}'):
-									# Prepare search context with only relevant information
-									from research_agent.models import SearchContext
-									search_context = SearchContext(
-										research_topic=st.session_state.research_topic,
-										current_subtopic=task['topic'],
-										iteration=st.session_state.current_iteration
-									)
-
-									# Perform research
-									search_response = search_module.search(
-										task['question'],
-										openai_api_key,
-										context=search_context,
-									)
-
-									# Summarize findings
-									summary = search_module.summarize(
-										search_response.results,
-										task['question'],
-										openai_api_key,
-										context=search_context,
-									)
-
-									# Add citations
-									citations = [
-										{
-											'title': result.title,
-											'url': result.link,
-											'snippet': result.snippet,
-											'accessed_date': result.accessed_date.isoformat(),
-										}
-										for result in search_response.results
-									]
-
-									# Store research results
-									st.session_state.research_summaries.append(
-										{
-											'task': current_task,
-											'summary': summary,
-											'citations': citations,
-											'iteration': st.session_state.current_iteration,
-										}
-									)
-
-									# Update results display in real-time
-									with latest_results_container:
-										st.markdown("### Latest Research Results")
-										latest_summary = st.session_state.research_summaries[-1]
-										with st.expander(f"{latest_summary['task']} (In Progress)", expanded=True):
-											st.write(latest_summary['summary'])
-											if latest_summary['citations']:
-												st.markdown("**Sources:**")
-												for citation in latest_summary['citations']:
-													st.markdown(f"- [{citation['title']}]({citation['url']})")
-
-								# Remove completed task from queue
-								st.session_state.research_queue.remove(task)
-
-							# Evaluate research completion
-							try:
-								decision = decision_module.is_research_complete(
-									st.session_state.research_summaries,
-									st.session_state.research_topic,
-									openai_api_key,
-								)
-								
-								# If skip_gaps is enabled, clear any gaps and mark as complete
-								if st.session_state.skip_gaps:
-									decision.gaps = []
-									decision.is_complete = True
-								
-							except DecisionModuleError as e:
-								st.error(f'Error evaluating research completion: {str(e)}')
-								break
-							except Exception as e:
-								st.error(f'Unexpected error during research evaluation: {str(e)}')
-								break
-
-							# Update research context with latest findings
-							st.session_state.research_context.update({
-								'latest_decision': decision,
-								'total_summaries': len(st.session_state.research_summaries),
-								'current_iteration': st.session_state.current_iteration,
-							})
-
-							# Only show gaps if not skipping
-							if not st.session_state.skip_gaps:
-								with gaps_container:
-									if decision.gaps:
-										st.markdown('### Current Research Gaps')
-										for i, gap in enumerate(decision.gaps, 1):
-											st.markdown(f'**{i}.** {gap}')
-										if decision.reasoning:
-											st.markdown('---')
-											st.markdown('**Decision Reasoning:**')
-											st.markdown(decision.reasoning)
-
-							if decision.is_complete:
-								st.session_state.research_complete = True
-								status_container.text('Research complete! Generating final report...')
-
-								# Generate final report
-								with st.spinner('Generating final report...'):
-									st.session_state.final_report = report_generator.generate_report(
-										st.session_state.research_topic,
-										st.session_state.research_plan,
-										st.session_state.research_summaries,
-										openai_api_key,
-									)
-								break
-							else:
-								# Add new research tasks based on gaps
-								if decision.gaps:
-									for gap in decision.gaps:
-										if not any(task['question'] == gap for task in st.session_state.research_queue):
-											st.session_state.research_queue.append(
-												{
-													'topic': f'Gap Research (Iteration {st.session_state.current_iteration + 1})',
-													'question': gap,
-													'priority': 2,
-													'iteration': st.session_state.current_iteration + 1,
-												}
-											)
-
-							# Sort queue by priority
-							st.session_state.research_queue.sort(key=lambda x: (-x['priority'], x['iteration']))
-
-							# Increment iteration counter
-							st.session_state.current_iteration += 1
-
-						# Check if we've reached max iterations
-						if st.session_state.current_iteration >= st.session_state.max_iterations:
-							st.warning(f'Reached maximum research iterations ({st.session_state.max_iterations}). Some gaps may remain.')
-							st.session_state.research_complete = True
-
-						# Clean up temporary containers
-						progress_container.empty()
-						status_container.empty()
-						
-						st.rerun()  # Single rerun at the end of all processing
-
-					except Exception as e:
-						st.error(f'Error during research process: {str(e)}')
-						st.session_state.error_message = str(e)
-						st.rerun()
+				if st.button('Execute Research Plan', key='execute_research_plan'):
+					st.session_state.research_state = 'iterating'
+					st.session_state.progress_fraction = min(
+						(st.session_state.current_iteration + 1) / st.session_state.max_iterations, 1.0
+					)
 			with col2:
 				if st.button('Generate Report Now'):
 					try:
@@ -495,76 +998,55 @@ if st.session_state.research_plan:
 							st.error('Please provide your OpenAI API key in the sidebar.')
 							st.rerun()
 
-						with st.spinner('Generating final report with current findings...'):
-							try:
-								st.session_state.final_report = report_generator.generate_report(
-									st.session_state.research_topic,
-									st.session_state.research_plan,
-									st.session_state.research_summaries,
-									openai_api_key,
-								)
-								st.success('Report generated successfully!')
-								st.session_state.research_complete = (
-									True  # Only set to True after successful generation
-								)
-								st.rerun()
-							except ReportGeneratorError as e:
-								st.error(f'Failed to generate report: {str(e)}')
-								st.session_state.final_report = None
-								st.session_state.error_message = str(e)
-								st.rerun()
+						# Generate the report in the background; a failure sets research_complete back
+						start_final_report(openai_api_key)
+						st.session_state.research_complete = True
+						st.session_state.research_state = 'idle'
+						st.rerun()
 					except Exception as e:
 						st.error(f'An unexpected error occurred: {str(e)}')
 						st.session_state.final_report = None
 						st.session_state.error_message = str(e)
 
-	# Research progress section - independent of research plan visibility
-	if st.session_state.research_summaries and st.session_state.show_research_progress:
-		st.subheader('Research Progress')
-
-		# Create a container for gaps display that will update in real-time
-		gaps_container = st.empty()
-
-		# Display current research gaps if any
-		if 'research_context' in st.session_state and st.session_state.research_context.get('latest_decision'):
-			latest_decision = st.session_state.research_context['latest_decision']
-			with gaps_container:
-				if latest_decision.gaps:
-					st.markdown('### Current Research Gaps')
-					for i, gap in enumerate(latest_decision.gaps, 1):
-						st.markdown(f'**{i}.** {gap}')
-					if latest_decision.reasoning:
-						st.markdown('---')
-						st.markdown('**Decision Reasoning:**')
-						st.markdown(latest_decision.reasoning)
-
-		# Create a unique identifier for each summary to prevent duplicates
-		# Initialize a container for summaries
-		summary_container = st.container()
-
-		# Group summaries by iteration
-		summaries_by_iteration = {}
-		for summary in st.session_state.research_summaries:
-			iteration = summary.get('iteration', 0)
-			if iteration not in summaries_by_iteration:
-				summaries_by_iteration[iteration] = []
-			summaries_by_iteration[iteration].append(summary)
-
-		# Display summaries grouped by iteration
-		with summary_container:
-			for iteration in sorted(summaries_by_iteration.keys()):
-				st.markdown(f'**Iteration {iteration + 1}**')
-				for i, summary in enumerate(summaries_by_iteration[iteration]):
-					# Create a unique key for each summary based on task and iteration
-					summary_key = f'summary_{iteration}_{i}_{hash(summary["task"])}'
-					with st.expander(f'{summary["task"]}'):
-						st.write(summary['summary'])
-						if summary['citations']:
-							st.markdown('**Sources:**')
-							for citation in summary['citations']:
-								st.markdown(f'- [{citation["title"]}]({citation["url"]})')
+		if st.session_state.research_state == 'iterating':
+			st.progress(st.session_state.progress_fraction)
+			# Holds the live output of the iteration, which runs after the progress is rendered
+			iteration_container = st.container()
+
+	render_research_progress()
+
+	if iteration_container is not None:
+		with iteration_container:
+			try:
+				run_research_iteration(openai_api_key)
+			except Exception as e:
+				st.session_state.error_message = f'Error during research process: {str(e)}'
+				st.session_state.research_state = 'idle'
+
+		# One iteration per rerun; finishing or failing reruns the whole app
+		if st.session_state.research_state == 'iterating':
+			rerun_fragment()
+		st.rerun()
+
+
+# Display research plan if available and enabled
+if st.session_state.research_plan:
+	if st.session_state.show_research_plan:
+		st.subheader('Research Plan')
+		for i, topic in enumerate(st.session_state.research_plan.topics):
+			with st.expander(f'Topic {i + 1}: {topic.title}'):
+				# One element per topic rather than one per question
+				st.markdown(
+					'\n'.join(f'{j + 1}. {question}' for j, question in enumerate(topic.questions))
+				)
+
+	# Research control and progress section - controls only show while research isn't complete
+	research_controls(openai_api_key)
 
 	# Display final report if available (keep this separate)
 	if st.session_state.final_report:
 		st.subheader('Final Research Report')
 		st.markdown(st.session_state.final_report)
+	elif st.session_state.report_job:
+		st.subheader('Final Research Report')
+		report_progress()
@@ -0,0 +1,33 @@
+from openai import AsyncOpenAI, OpenAI
+import contextlib
+import functools
+from typing import AsyncIterator, Optional
+
+# Retries of a rate-limited (429) or failed (5xx) request. The openai client backs off
+# exponentially with jitter between attempts and honors the server's Retry-After header.
+MAX_RETRIES = 5
+
+
+@functools.lru_cache(maxsize=4)
+def get_client(api_key: str) -> OpenAI:
+	"""Return a shared OpenAI client for the API key, so its connection pool is reused across calls."""
+	return OpenAI(api_key=api_key)
+
+
+def create_async_client(api_key: str) -> AsyncOpenAI:
+	"""Create an async client to share between concurrent calls on one event loop.
+
+	httpx async connections belong to the loop that opened them, so open the client with
+	`async with` on the loop the calls run on, and let it close once they have finished.
+	"""
+	return AsyncOpenAI(api_key=api_key, max_retries=MAX_RETRIES)
+
+
+@contextlib.asynccontextmanager
+async def async_client_scope(api_key: str, client: Optional[AsyncOpenAI]) -> AsyncIterator[AsyncOpenAI]:
+	"""Use the caller's client, or a new one that is closed when the call is done."""
+	if client is not None:
+		yield client
+		return
+	async with create_async_client(api_key) as own_client:
+		yield own_client
@@ -1,6 +1,8 @@
-from openai import OpenAI
 import logging
-import json
+import orjson
+import time
+from typing import Dict, List, Tuple
+from .client import get_client
 from .models import ResearchDecision
 
 
@@ -10,6 +12,96 @@ class DecisionModuleError(Exception):
 	pass
 
 
+# JSON schema properties of a research decision
+DECISION_PROPERTIES = {
+	'is_complete': {
+		'type': 'boolean',
+		'description': 'Whether the research is considered complete',
+	},
+	'reasoning': {
+		'type': 'string',
+		'description': 'Explanation of why the research is or is not complete',
+	},
+	'gaps': {
+		'type': 'array',
+		'description': 'Specific gaps in the research that need to be addressed',
+		'items': {'type': 'string'},
+	},
+}
+
+# Extra property of an incremental decision, carried over to the next evaluation
+COVERED_ASPECTS_PROPERTY = {
+	'covered_aspects': {
+		'type': 'array',
+		'description': 'Aspects of the topic the research has covered so far',
+		'items': {'type': 'string'},
+	},
+}
+
+
+def _decision_format(properties: dict) -> dict:
+	"""Build the structured-output text format for a decision with the given schema properties."""
+	return {
+		'format': {
+			'type': 'json_schema',
+			'name': 'research_decision',
+			'strict': True,
+			'schema': {
+				'type': 'object',
+				'properties': properties,
+				'required': list(properties),
+				'additionalProperties': False,
+			},
+		}
+	}
+
+
+# Structured-output formats, built once rather than on every call
+DECISION_FORMAT = _decision_format(DECISION_PROPERTIES)
+INCREMENTAL_DECISION_FORMAT = _decision_format({**DECISION_PROPERTIES, **COVERED_ASPECTS_PROPERTY})
+
+# Prompt for evaluating every summary collected so far
+DECISION_PROMPT = """I'm researching the topic: '{topic}'
+            
+            So far, I've collected the following research summaries:
+            
+            {formatted_summaries}
+            
+            Based on these summaries, do I have enough information to create a comprehensive research report on the topic? 
+            Consider whether the key aspects of the topic have been covered and if there are any significant gaps in the research.
+            
+            Please provide your assessment in the following JSON format:
+            {{
+                "is_complete": true/false,
+                "reasoning": "Your detailed explanation of why the research is or is not complete",
+                "gaps": ["List specific areas or questions that still need to be researched"]
+            }}
+            """
+
+# Prompt for evaluating the summaries added since the previous evaluation
+INCREMENTAL_DECISION_PROMPT = """I'm researching the topic: '{topic}'
+
+            Aspects covered by my earlier research:
+            {formatted_covered}
+            Gaps found in my previous assessment:
+            {formatted_gaps}
+            Since then, I've collected the following new research summaries:
+
+            {formatted_summaries}
+
+            Based on the earlier coverage and these new summaries, do I have enough information to create a comprehensive research report on the topic?
+            Consider whether the key aspects of the topic have been covered and if there are any significant gaps in the research.
+
+            Please provide your assessment in the following JSON format:
+            {{
+                "is_complete": true/false,
+                "reasoning": "Your detailed explanation of why the research is or is not complete",
+                "gaps": ["List specific areas or questions that still need to be researched"],
+                "covered_aspects": ["Every aspect of the topic covered so far, including the earlier ones"]
+            }}
+            """
+
+
 class DecisionAgent:
 	"""Determines when enough research has been done to generate a final report."""
 
@@ -40,122 +132,102 @@ class DecisionAgent:
 			)
 
 		try:
-			# Initialize the OpenAI client with the API key
-			client = OpenAI(api_key=api_key)
-
 			self.logger.debug(f'Evaluating research completion for topic: {topic}')
 
 			# Format the research summaries for the prompt
-			formatted_summaries = ''
-			for i, summary in enumerate(research_summaries):
-				formatted_summaries += f'Research Step {i + 1}: {summary["task"]}\n'
-				formatted_summaries += f'Summary: {summary["summary"]}\n\n'
-
-			# Create a prompt for the LLM
-			prompt = f"""I'm researching the topic: '{topic}'
-            
-            So far, I've collected the following research summaries:
-            
-            {formatted_summaries}
-            
-            Based on these summaries, do I have enough information to create a comprehensive research report on the topic? 
-            Consider whether the key aspects of the topic have been covered and if there are any significant gaps in the research.
-            
-            Please provide your assessment in the following JSON format:
-            {{
-                "is_complete": true/false,
-                "reasoning": "Your detailed explanation of why the research is or is not complete",
-                "gaps": ["List specific areas or questions that still need to be researched"]
-            }}
-            """
-
-			# Log the request
-			self.logger.debug(
-				f'Sending request to OpenAI API with prompt length: {len(prompt)} characters'
+			formatted_summaries = ''.join(
+				f'Research Step {i + 1}: {summary["task"]}\nSummary: {summary["summary"]}\n\n'
+				for i, summary in enumerate(research_summaries)
 			)
 
-			import time
+			# Create a prompt for the LLM
+			prompt = DECISION_PROMPT.format(topic=topic, formatted_summaries=formatted_summaries)
 
-			start_time = time.time()
+			json_response = self._request_decision(prompt, api_key, DECISION_FORMAT)
 
 			try:
-				# Call the OpenAI API using the responses endpoint with JSON schema
-				response = client.responses.create(
-					model='gpt-4o-mini',
-					input=[{'role': 'system', 'content': [{'type': 'input_text', 'text': prompt}]}],
-					text={
-						'format': {
-							'type': 'json_schema',
-							'name': 'research_decision',
-							'strict': True,
-							'schema': {
-								'type': 'object',
-								'properties': {
-									'is_complete': {
-										'type': 'boolean',
-										'description': 'Whether the research is considered complete',
-									},
-									'reasoning': {
-										'type': 'string',
-										'description': 'Explanation of why the research is or is not complete',
-									},
-									'gaps': {
-										'type': 'array',
-										'description': 'Specific gaps in the research that need to be addressed',
-										'items': {'type': 'string'},
-									},
-								},
-								'required': ['is_complete', 'reasoning', 'gaps'],
-								'additionalProperties': False,
-							},
-						}
-					},
-					tools=[],
-					store=True,
+				# The strict response schema already guarantees the shape, so skip re-validating it
+				decision = ResearchDecision.model_construct(**json_response)
+
+				self.logger.info(
+					f'Decision: {decision.is_complete}, Reasoning: {decision.reasoning[:100]}...'
 				)
+				return decision
+
 			except Exception as e:
-				error_msg = f'API call failed: {str(e)}'
+				error_msg = f'Error processing API response: {str(e)}'
 				self.logger.error(error_msg)
 				raise DecisionModuleError(error_msg)
 
-			# Calculate and log response time
-			response_time = time.time() - start_time
-			self.logger.info(f'Received decision response in {response_time:.2f} seconds')
+		except DecisionModuleError:
+			# Re-raise DecisionModuleError to be handled by caller
+			raise
+		except Exception as e:
+			# Catch any other unexpected errors
+			error_msg = f'Unexpected error in decision module: {str(e)}'
+			self.logger.error(error_msg)
+			raise DecisionModuleError(error_msg)
+
+	def is_research_complete_incremental(
+		self, prev_state: Dict, new_summaries: list, topic: str, api_key: str
+	) -> Tuple[ResearchDecision, Dict]:
+		"""Check research completion from the summaries added since the previous evaluation.
 
-			# Log detailed response information
-			self.logger.debug('OpenAI API Response Details:')
-			self.logger.debug(f'Raw response: {response}')
-			self.logger.debug(f'Response ID: {response.id if hasattr(response, "id") else "N/A"}')
+		Only the new summaries and a compact state carried over from the previous evaluation enter
+		the prompt, so its size follows the batch rather than the whole research history.
+
+		Args:
+		    prev_state (Dict): State returned by the previous evaluation, with 'covered_aspects' and
+		        'open_gaps' lists. Empty for the first evaluation.
+		    new_summaries (list): Research summaries collected since the previous evaluation
+		    topic (str): The original research topic
+		    api_key (str): OpenAI API key
+
+		Returns:
+		    Tuple[ResearchDecision, Dict]: The decision, and the state to pass to the next evaluation
+
+		Raises:
+		    DecisionModuleError: If there's an error with the API call or response processing
+		"""
+		covered_aspects: List[str] = prev_state.get('covered_aspects', [])
+		open_gaps: List[str] = prev_state.get('open_gaps', [])
+
+		# Without any research so far, there is nothing to evaluate
+		if not new_summaries and not covered_aspects:
+			decision = self.is_research_complete([], topic, api_key)
+			return decision, {'covered_aspects': [], 'open_gaps': decision.gaps}
+
+		try:
 			self.logger.debug(
-				f'Model used: {response.model if hasattr(response, "model") else "N/A"}'
+				f'Evaluating {len(new_summaries)} new summaries for topic: {topic}'
 			)
-			self.logger.debug(
-				f'Response created: {response.created if hasattr(response, "created") else "N/A"}'
+
+			formatted_covered = ''.join(f'- {aspect}\n' for aspect in covered_aspects) or 'None yet\n'
+			formatted_gaps = ''.join(f'- {gap}\n' for gap in open_gaps) or 'None\n'
+			formatted_summaries = ''.join(
+				f'Research Step {i + 1}: {summary["task"]}\nSummary: {summary["summary"]}\n\n'
+				for i, summary in enumerate(new_summaries)
+			) or 'No new research since the previous assessment.\n'
+
+			# Create a prompt for the LLM
+			prompt = INCREMENTAL_DECISION_PROMPT.format(
+				topic=topic,
+				formatted_covered=formatted_covered,
+				formatted_gaps=formatted_gaps,
+				formatted_summaries=formatted_summaries,
 			)
 
-			# Check for API errors in the response
-			if response.error:
-				error_msg = f'API Error ({response.error.code}): {response.error.message}'
-				self.logger.error(error_msg)
-				raise DecisionModuleError(error_msg)
+			json_response = self._request_decision(prompt, api_key, INCREMENTAL_DECISION_FORMAT)
 
 			try:
-				# Extract the decision from the response
-				json_response = json.loads(response.output_text)
-				self.logger.debug(f'Response JSON: {json_response}')
-
-				# Create and return a ResearchDecision object using model_validate
-				decision = ResearchDecision.model_validate(json_response)
+				covered_aspects = json_response.pop('covered_aspects')
+				decision = ResearchDecision.model_construct(**json_response)
 
 				self.logger.info(
 					f'Decision: {decision.is_complete}, Reasoning: {decision.reasoning[:100]}...'
 				)
-				return decision
+				return decision, {'covered_aspects': covered_aspects, 'open_gaps': decision.gaps}
 
-			except json.JSONDecodeError as e:
-				error_msg = f'Failed to parse API response as JSON: {str(e)}'
-				self.logger.error(error_msg)
-				raise DecisionModuleError(error_msg)
 			except Exception as e:
 				error_msg = f'Error processing API response: {str(e)}'
 				self.logger.error(error_msg)
@@ -169,3 +241,90 @@ class DecisionAgent:
 			error_msg = f'Unexpected error in decision module: {str(e)}'
 			self.logger.error(error_msg)
 			raise DecisionModuleError(error_msg)
+
+	def _request_decision(self, prompt: str, api_key: str, text_format: Dict) -> Dict:
+		"""Send a decision prompt to the OpenAI API and parse the structured JSON response.
+
+		Args:
+		    prompt (str): The decision prompt
+		    api_key (str): OpenAI API key
+		    text_format (Dict): Structured-output format of the response
+
+		Returns:
+		    Dict: The parsed response
+
+		Raises:
+		    DecisionModuleError: If the API call fails or its response can't be parsed
+		"""
+		# Get the shared OpenAI client for the API key
+		client = get_client(api_key)
+
+		# Log the request
+		self.logger.debug(
+			f'Sending request to OpenAI API with prompt length: {len(prompt)} characters'
+		)
+
+		start_time = time.time()
+
+		try:
+			# Call the OpenAI API using the responses endpoint with JSON schema, streaming the
+			# output so the JSON is collected while it is generated
+			stream = client.responses.create(
+				model='gpt-4o-mini',
+				input=[{'role': 'system', 'content': [{'type': 'input_text', 'text': prompt}]}],
+				text=text_format,
+				tools=[],
+				store=True,
+				stream=True,
+			)
+
+			parts = []
+			response = None
+			for event in stream:
+				if event.type == 'response.output_text.delta':
+					if not parts:
+						self.logger.debug(
+							f'Received first decision chunk in {time.time() - start_time:.2f} seconds'
+						)
+					parts.append(event.delta)
+				elif event.type in ('response.completed', 'response.failed', 'response.incomplete'):
+					response = event.response
+				elif event.type == 'error':
+					raise DecisionModuleError(f'API Error ({event.code}): {event.message}')
+		except DecisionModuleError as e:
+			self.logger.error(str(e))
+			raise
+		except Exception as e:
+			error_msg = f'API call failed: {str(e)}'
+			self.logger.error(error_msg)
+			raise DecisionModuleError(error_msg)
+
+		# Calculate and log response time
+		response_time = time.time() - start_time
+		self.logger.info(f'Received decision response in {response_time:.2f} seconds')
+
+		# Log detailed response information, formatting it only when it will be emitted
+		if response is not None and self.logger.isEnabledFor(logging.DEBUG):
+			self.logger.debug('OpenAI API Response Details:')
+			self.logger.debug(f'Raw response: {response}')
+			self.logger.debug(f'Response ID: {getattr(response, "id", "N/A")}')
+			self.logger.debug(f'Model used: {getattr(response, "model", "N/A")}')
+			self.logger.debug(f'Response created: {getattr(response, "created", "N/A")}')
+
+		# Check for API errors in the response
+		if response is not None and response.error:
+			error_msg = f'API Error ({response.error.code}): {response.error.message}'
+			self.logger.error(error_msg)
+			raise DecisionModuleError(error_msg)
+
+		try:
+			# Extract the decision from the response
+			json_response = orjson.loads(''.join(parts))
+			if self.logger.isEnabledFor(logging.DEBUG):
+				self.logger.debug(f'Response JSON: {json_response}')
+			return json_response
+
+		except orjson.JSONDecodeError as e:
+			error_msg = f'Failed to parse API response as JSON: {str(e)}'
+			self.logger.error(error_msg)
+			raise DecisionModuleError(error_msg)
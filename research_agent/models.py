@@ -1,66 +1,65 @@
 from typing import List, Optional, Dict
 from typing_extensions import Annotated
-from pydantic import BaseModel, Field, validator, AfterValidator
+from pydantic import BaseModel, Field, AfterValidator
 from datetime import datetime
 
 
+def url_not_empty(v: str) -> str:
+	if not v.strip():
+		raise ValueError('URL cannot be empty')
+	return v
+
+
+def title_not_empty(v: str) -> str:
+	if not v.strip():
+		raise ValueError('Research topic title cannot be empty')
+	return v.strip()
+
+
+def questions_not_empty(v: List[str]) -> List[str]:
+	if not v:
+		raise ValueError('Research topic must have at least one question')
+	for i, question in enumerate(v):
+		if not question.strip():
+			raise ValueError(f'Question {i + 1} cannot be empty')
+		v[i] = question.strip()
+	return v
+
+
 class Citation(BaseModel):
 	"""Represents a citation source for research information."""
 
 	title: str = Field(..., description='The title of the source')
-	url: str = Annotated[
-		Field(..., description='The URL of the source'), AfterValidator('url_not_empty')
-	]
+	url: Annotated[str, AfterValidator(url_not_empty)] = Field(
+		..., description='The URL of the source'
+	)
 	snippet: str = Field(..., description='The relevant text snippet from the source')
 	accessed_date: datetime = Field(
 		default_factory=datetime.now, description='When the source was accessed'
 	)
-	annotation: dict = Field(default=None, description='Annotation details for inline citation')
-
-	def url_not_empty(v: str):
-		if not v.strip():
-			raise ValueError('URL cannot be empty')
-		return v
+	annotation: Optional[dict] = Field(
+		default=None, description='Annotation details for inline citation'
+	)
 
 
 class ResearchTopic(BaseModel):
 	"""Represents a single research topic with related questions."""
 
-	title: str = Annotated[
-		Field(..., description='The title of the research topic'), AfterValidator('title_not_empty')
-	]
-	questions: List[str] = Annotated[
-		Field(..., description='A list of questions related to the research topic'),
-		AfterValidator('questions_not_empty'),
-	]
-
-	def title_not_empty(v: str):
-		if not v.strip():
-			raise ValueError('Research topic title cannot be empty')
-		return v.strip()
-
-	def questions_not_empty(v: List[str]):
-		if not v:
-			raise ValueError('Research topic must have at least one question')
-		for i, question in enumerate(v):
-			if not question.strip():
-				raise ValueError(f'Question {i + 1} cannot be empty')
-			v[i] = question.strip()
-		return v
+	title: Annotated[str, AfterValidator(title_not_empty)] = Field(
+		..., description='The title of the research topic'
+	)
+	questions: Annotated[List[str], AfterValidator(questions_not_empty)] = Field(
+		..., description='A list of questions related to the research topic'
+	)
 
 
 class ResearchPlan(BaseModel):
 	"""Represents a complete research plan with multiple topics and their questions."""
 
-	topics: List[ResearchTopic] = Annotated[
-		Field(..., description='A list of research topics to investigate'),
-		AfterValidator('validate_topics'),
-	]
-
-	def validate_topics(v: List[ResearchTopic]):
-		if not v:
-			raise ValueError('Research plan must have at least one topic')
-		return v
+	# The length bound is checked natively by pydantic-core instead of a Python validator
+	topics: List[ResearchTopic] = Field(
+		..., min_length=1, description='A list of research topics to investigate'
+	)
 
 
 class ResearchSummary(BaseModel):
@@ -1,6 +1,6 @@
-from openai import OpenAI
-import json
 import logging
+import time
+from .client import get_client
 from .models import ResearchPlan
 from typing import Optional
 
@@ -11,6 +11,41 @@ class ResearchPlannerError(Exception):
 	pass
 
 
+def _strict_schema(schema: dict) -> dict:
+	"""Close every object in a pydantic JSON schema, as strict structured outputs requires."""
+	if schema.get('type') == 'object':
+		schema['additionalProperties'] = False
+	for key in ('properties', '$defs'):
+		for subschema in schema.get(key, {}).values():
+			_strict_schema(subschema)
+	if isinstance(schema.get('items'), dict):
+		_strict_schema(schema['items'])
+	return schema
+
+
+# Structured-output format of a research plan, generated once from the model so the two can't drift
+PLAN_FORMAT = {
+	'format': {
+		'type': 'json_schema',
+		'name': 'research_plan',
+		'strict': True,
+		'schema': _strict_schema(ResearchPlan.model_json_schema()),
+	}
+}
+
+# Prompt for creating a research plan
+PLAN_PROMPT = """Develop a detailed research plan for the topic: '{topic}'{clarification_text}, focusing on the following aspects to facilitate research and producing a report on the topic.
+
+        The research plan should:
+        1. Break down the topic into key subtopics to investigate based on the complexity and scope of the subject
+        2. For each subtopic, provide specific questions to research that are appropriate for that particular subtopic
+        3. Arrange these in a logical order, from foundational concepts to more specific aspects
+        4. Focus on factual, informative aspects that would be useful for a research report
+        5. Ensure each question is specific enough to be used as a search query
+        6. Adjust the depth and breadth of the research plan based on the topic's complexity
+        """
+
+
 class ResearchPlannerAgent:
 	"""Generates a structured research plan for a given topic using an LLM."""
 
@@ -32,78 +67,28 @@ class ResearchPlannerAgent:
 		Raises:
 		    ResearchPlannerError: If the plan creation fails due to API errors or invalid responses
 		"""
-		# Initialize the OpenAI client with the API key
-		client = OpenAI(api_key=api_key)
+		# Get the shared OpenAI client for the API key
+		client = get_client(api_key)
 
 		# Create a prompt for the LLM
 		clarification_text = f'\n\nUser clarification: {clarification}' if clarification else ''
 
-		prompt = f"""Develop a detailed research plan for the topic: '{topic}'{clarification_text}, focusing on the following aspects to facilitate research and producing a report on the topic.
-
-        The research plan should:
-        1. Break down the topic into key subtopics to investigate based on the complexity and scope of the subject
-        2. For each subtopic, provide specific questions to research that are appropriate for that particular subtopic
-        3. Arrange these in a logical order, from foundational concepts to more specific aspects
-        4. Focus on factual, informative aspects that would be useful for a research report
-        5. Ensure each question is specific enough to be used as a search query
-        6. Adjust the depth and breadth of the research plan based on the topic's complexity
-        """
+		prompt = PLAN_PROMPT.format(topic=topic, clarification_text=clarification_text)
 
 		self.logger.info(f'Sending research plan request for topic: {topic}')
 		if clarification:
 			self.logger.info(f'With user clarification: {clarification}')
-		self.logger.debug(f'Full prompt: {prompt}')
+		if self.logger.isEnabledFor(logging.DEBUG):
+			self.logger.debug(f'Full prompt: {prompt}')
 
 		try:
-			import time
-
 			start_time = time.time()
 
-			# Log the request parameters
-			self.logger.debug(f'Sending request to OpenAI API with prompt: {prompt}')
-
 			# Call the OpenAI API using the responses endpoint with JSON schema
 			response = client.responses.create(
 				model='o3-mini',
 				input=[{'role': 'developer', 'content': [{'type': 'input_text', 'text': prompt}]}],
-				text={
-					'format': {
-						'type': 'json_schema',
-						'name': 'research_plan',
-						'strict': True,
-						'schema': {
-							'type': 'object',
-							'properties': {
-								'topics': {
-									'type': 'array',
-									'description': 'A list of research topics to investigate',
-									'items': {'$ref': '#/$defs/research_topic'},
-								}
-							},
-							'required': ['topics'],
-							'additionalProperties': False,
-							'$defs': {
-								'research_topic': {
-									'type': 'object',
-									'description': 'Represents a single research topic with related questions.',
-									'properties': {
-										'title': {
-											'type': 'string',
-											'description': 'The title of the research topic',
-										},
-										'questions': {
-											'type': 'array',
-											'description': 'A list of questions related to the research topic',
-											'items': {'type': 'string'},
-										},
-									},
-									'required': ['title', 'questions'],
-									'additionalProperties': False,
-								}
-							},
-						},
-					}
-				},
+				text=PLAN_FORMAT,
 				reasoning={'effort': 'medium'},
 				tools=[],
 				store=True,
@@ -121,21 +106,19 @@ class ResearchPlannerAgent:
 				self.logger.error(error_msg)
 				raise ResearchPlannerError(error_msg)
 
-			# Log detailed response information
-			json_response = json.loads(response.output_text)
-			self.logger.debug('OpenAI API Response Details:')
-			self.logger.debug(f'Raw response: {response}')
-			self.logger.debug(f'Response ID: {response.id if hasattr(response, "id") else "N/A"}')
-			self.logger.debug(
-				f'Model used: {response.model if hasattr(response, "model") else "N/A"}'
-			)
-			self.logger.debug(
-				f'Response created: {response.created if hasattr(response, "created") else "N/A"}'
-			)
-
-			# Extract the research plan directly from the JSON response
-			research_plan = ResearchPlan.model_validate(json_response)
-			self.logger.debug(f'Validated research plan: {research_plan.dict()}')
+			# Log detailed response information, formatting it only when it will be emitted
+			debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+			if debug_enabled:
+				self.logger.debug('OpenAI API Response Details:')
+				self.logger.debug(f'Raw response: {response}')
+				self.logger.debug(f'Response ID: {getattr(response, "id", "N/A")}')
+				self.logger.debug(f'Model used: {getattr(response, "model", "N/A")}')
+				self.logger.debug(f'Response created: {getattr(response, "created", "N/A")}')
+
+			# Parse and validate the research plan in a single pass over the JSON response
+			research_plan = ResearchPlan.model_validate_json(response.output_text)
+			if debug_enabled:
+				self.logger.debug(f'Validated research plan: {research_plan.model_dump_json()}')
 			return research_plan
 
 		except Exception as e:
@@ -0,0 +1,37 @@
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Tuple
+
+
+class PriorityQueue:
+	"""Binary min-heap of research tasks ordered by priority, then iteration, then insertion."""
+
+	def __init__(self):
+		"""Initialize an empty priority queue."""
+		self._heap: List[Tuple[int, int, int, Dict]] = []
+		self._counter = itertools.count()
+
+	def push(self, task: Dict) -> None:
+		"""Add a task to the queue.
+
+		Args:
+		    task (Dict): Research task with 'priority' and 'iteration' keys. Higher priorities
+		        are drained first; ties go to the earlier iteration, then to insertion order.
+		"""
+		heapq.heappush(
+			self._heap, (-task['priority'], task['iteration'], next(self._counter), task)
+		)
+
+	def drain(self) -> List[Dict]:
+		"""Remove and return every queued task, highest priority first."""
+		# The sequence number is unique, so sorting never falls through to comparing tasks
+		tasks = [entry[-1] for entry in sorted(self._heap)]
+		self._heap = []
+		return tasks
+
+	def __len__(self) -> int:
+		return len(self._heap)
+
+	def __iter__(self) -> Iterator[Dict]:
+		"""Iterate over the queued tasks in heap order (not fully sorted)."""
+		return (entry[-1] for entry in self._heap)
@@ -1,8 +1,11 @@
 import openai
-from openai import OpenAI
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import re
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Iterator, Optional
+from .client import get_client
+from .models import ResearchPlan
 
 
 class ReportGeneratorError(Exception):
@@ -11,109 +14,12 @@ class ReportGeneratorError(Exception):
 	pass
 
 
-class ReportGeneratorAgent:
-	"""Generates a final research report in Markdown format based on collected summaries."""
-
-	def __init__(self):
-		"""Initialize the report generator."""
-		self.logger = logging.getLogger(__name__)
-
-	def generate_report(
-		self, topic: str, research_plan: Any, research_summaries: List[Dict], api_key: str
-	) -> str:
-		"""Generate a comprehensive research report based on the collected summaries.
-
-		Args:
-		    topic (str): The original research topic
-		    research_plan (Any): The research plan steps
-		    research_summaries (List[Dict]): List of research summaries collected
-		    api_key (str): OpenAI API key
+# Inline citation markers of a summary, like [2] or [1, 3]
+CITATION_MARKER_PATTERN = re.compile(r'\[(\d+(?:\s*,\s*\d+)*)\]')
 
-		Returns:
-		    str: A markdown-formatted research report
-
-		Raises:
-		    ReportGeneratorError: If there's an error during report generation
-		"""
-		try:
-			if not api_key:
-				raise ReportGeneratorError('OpenAI API key is required')
 
-			if not topic:
-				raise ReportGeneratorError('Research topic is required')
-
-			if not research_summaries:
-				raise ReportGeneratorError('No research summaries provided')
-
-			self.logger.debug('Input validation passed')
-			client = OpenAI(api_key=api_key)
-			self.logger.debug('OpenAI client initialized')
-
-			self.logger.debug(f'Generating research report for topic: {topic}')
-
-			try:
-				self.logger.debug('Formatting research plan...')
-				# Format the research plan and summaries for the prompt
-				formatted_plan = '\n'.join([f'- {step}' for step in research_plan])
-				self.logger.debug('Research plan formatted successfully')
-
-				self.logger.debug('Formatting summaries and citations...')
-				formatted_summaries = ''
-				formatted_citations = ''
-				citation_index = 1
-				citation_map = {}
-
-				for i, summary in enumerate(research_summaries):
-					self.logger.debug(f'Processing summary {i + 1}/{len(research_summaries)}')
-					if not isinstance(summary, dict):
-						raise ReportGeneratorError(f'Invalid summary format at index {i}')
-
-					formatted_summaries += (
-						f'## Research on: {summary.get("task", "Unknown Task")}\n\n'
-					)
-					formatted_summaries += f'{summary.get("summary", "No summary available")}\n\n'
-
-					# Handle annotations/citations if they exist in the summary
-					if 'annotations' in summary and summary['annotations']:
-						citation_refs = []
-
-						for annotation in summary['annotations']:
-							citation_key = f'[{citation_index}]'
-							citation_refs.append(citation_key)
-
-							# Store citation information in the citation map
-							citation_map[citation_key] = {
-								'title': annotation.get('title', 'Untitled'),
-								'url': annotation.get('url', 'No URL available'),
-								'accessed_date': annotation.get(
-									'accessed_date', datetime.now().isoformat()
-								)[:10],  # YYYY-MM-DD
-								'snippet': annotation.get('snippet', ''),
-								'annotation': annotation.get('annotation', None),
-								'id': annotation.get('id', f'citation_{citation_index}'),
-							}
-							citation_index += 1
-
-						# Instead of just listing sources at the end, we'll preserve the original text with citations
-						# This maintains the inline citation format from the API response
-						summary_text = summary.get('summary', 'No summary available')
-
-						# Add the summary with properly formatted citations
-						formatted_summaries += f'{summary_text}\n\n'
-
-						# Add a list of sources at the end of each summary section for reference
-						formatted_summaries += 'Sources: ' + ', '.join(citation_refs) + '\n\n'
-
-				self.logger.debug('Summaries and citations formatted successfully')
-
-				if citation_map:
-					formatted_citations = '\n## Bibliography\n\n'
-					for key, citation in citation_map.items():
-						formatted_citations += f'{key} {citation["title"]}. Available at: {citation["url"]} (Accessed: {citation["accessed_date"]})\n\n'
-
-				self.logger.debug('Creating prompt...')
-				# Create prompt for the LLM
-				prompt = f"""I've been researching the topic: '{topic}'
+# Prompt for writing the report from the research plan, summaries and bibliography
+REPORT_PROMPT = """I've been researching the topic: '{topic}'
                 
                 My research plan was:
                 {formatted_plan}
@@ -138,71 +44,90 @@ class ReportGeneratorAgent:
                 Format the report using proper Markdown syntax with headings, bullet points, emphasis, etc.
                 """
 
-				self.logger.debug(f'Prompt created, length: {len(prompt)} characters')
-
-				import time
-
-				start_time = time.time()
-
-				try:
-					# Call the OpenAI API
-					response = client.responses.create(
-						model='gpt-4o-mini',
-						input=[
-							{
-								'role': 'system',
-								'content': [
-									{
-										'type': 'input_text',
-										'text': 'You are a research report writer that creates comprehensive, well-structured reports in Markdown format.',
-									}
-								],
-							},
-							{'role': 'user', 'content': [{'type': 'input_text', 'text': prompt}]},
-						],
-						temperature=0.7,
-						tools=[],
-						store=True,
-					)
-					self.logger.debug('API call completed')
 
-					response_time = time.time() - start_time
-					self.logger.info(
-						f'Received report generation response in {response_time:.2f} seconds'
-					)
+class ReportGeneratorAgent:
+	"""Generates a final research report in Markdown format based on collected summaries."""
+
+	def __init__(self):
+		"""Initialize the report generator."""
+		self.logger = logging.getLogger(__name__)
+
+	def generate_report(
+		self, topic: str, research_plan: ResearchPlan, research_summaries: List[Dict], api_key: str
+	) -> str:
+		"""Generate a comprehensive research report based on the collected summaries.
+
+		Args:
+		    topic (str): The original research topic
+		    research_plan (ResearchPlan): The research plan topics and their questions
+		    research_summaries (List[Dict]): List of research summaries collected
+		    api_key (str): OpenAI API key
+
+		Returns:
+		    str: A markdown-formatted research report
+
+		Raises:
+		    ReportGeneratorError: If there's an error during report generation
+		"""
+		# Collect the streamed report, so both entry points share one request path
+		return ''.join(self.stream_report(topic, research_plan, research_summaries, api_key))
+
+	def stream_report(
+		self, topic: str, research_plan: ResearchPlan, research_summaries: List[Dict], api_key: str
+	) -> Iterator[str]:
+		"""Generate the research report, yielding the markdown text as it is produced.
+
+		Args:
+		    topic (str): The original research topic
+		    research_plan (ResearchPlan): The research plan topics and their questions
+		    research_summaries (List[Dict]): List of research summaries collected
+		    api_key (str): OpenAI API key
 
-					if response.error:
-						error_msg = f'API Error ({response.error.code}): {response.error.message}'
-						self.logger.error(error_msg)
-						raise ReportGeneratorError(error_msg)
-
-					report = response.output_text
-
-					if not report:
-						raise ReportGeneratorError('Generated report is empty')
-
-					self.logger.debug(f'Generated report length: {len(report)} characters')
-					return report
-
-				except openai.APIError as e:
-					self.logger.error(f'OpenAI API error: {str(e)}')
-					raise ReportGeneratorError(f'OpenAI API error: {str(e)}')
-				except openai.APIConnectionError as e:
-					self.logger.error(f'Connection error: {str(e)}')
-					raise ReportGeneratorError(f'Error connecting to OpenAI API: {str(e)}')
-				except openai.RateLimitError as e:
-					self.logger.error(f'Rate limit error: {str(e)}')
-					raise ReportGeneratorError(f'OpenAI API rate limit exceeded: {str(e)}')
-				except openai.APITimeoutError as e:
-					self.logger.error(f'Timeout error: {str(e)}')
-					raise ReportGeneratorError(f'OpenAI API request timed out: {str(e)}')
-				except Exception as e:
-					self.logger.error(f'Unexpected API error: {str(e)}')
-					raise ReportGeneratorError(f'Error calling OpenAI API: {str(e)}')
+		Yields:
+		    str: The next chunk of the markdown-formatted research report
 
+		Raises:
+		    ReportGeneratorError: If there's an error during report generation
+		"""
+		try:
+			prompt = self._build_prompt(topic, research_plan, research_summaries, api_key)
+			client = get_client(api_key)
+
+			start_time = time.time()
+			report_length = 0
+
+			try:
+				stream = client.responses.create(**self._build_request(prompt), stream=True)
+
+				for event in stream:
+					if event.type == 'response.output_text.delta':
+						if not report_length:
+							self.logger.info(
+								f'Received first report chunk in {time.time() - start_time:.2f} seconds'
+							)
+						report_length += len(event.delta)
+						yield event.delta
+					elif event.type == 'response.failed' and event.response.error:
+						error = event.response.error
+						raise ReportGeneratorError(f'API Error ({error.code}): {error.message}')
+					elif event.type == 'response.incomplete':
+						# A report cut off by the token limit or a content filter must not pass as complete
+						details = event.response.incomplete_details
+						reason = details.reason if details else 'unknown'
+						raise ReportGeneratorError(f'Report stream stopped early ({reason})')
+					elif event.type == 'error':
+						raise ReportGeneratorError(f'API Error ({event.code}): {event.message}')
+			except ReportGeneratorError:
+				raise
 			except Exception as e:
-				self.logger.error(f'Error in formatting data: {str(e)}')
-				raise ReportGeneratorError(f'Error formatting research data: {str(e)}')
+				raise self._api_error(e)
+
+			if not report_length:
+				raise ReportGeneratorError('Generated report is empty')
+
+			self.logger.info(
+				f'Streamed report of {report_length} characters in {time.time() - start_time:.2f} seconds'
+			)
 
 		except ReportGeneratorError as e:
 			self.logger.error(f'Report generation error: {str(e)}')
@@ -210,3 +135,156 @@ class ReportGeneratorAgent:
 		except Exception as e:
 			self.logger.error(f'Unexpected error: {str(e)}')
 			raise ReportGeneratorError(f'Unexpected error in report generation: {str(e)}')
+
+	def _build_prompt(
+		self, topic: str, research_plan: ResearchPlan, research_summaries: List[Dict], api_key: str
+	) -> str:
+		"""Validate the inputs and build the report generation prompt.
+
+		Raises:
+		    ReportGeneratorError: If the inputs are missing or cannot be formatted
+		"""
+		if not api_key:
+			raise ReportGeneratorError('OpenAI API key is required')
+
+		if not topic:
+			raise ReportGeneratorError('Research topic is required')
+
+		if not research_summaries:
+			raise ReportGeneratorError('No research summaries provided')
+
+		self.logger.debug('Input validation passed')
+
+		self.logger.debug(f'Generating research report for topic: {topic}')
+
+		try:
+			self.logger.debug('Formatting research plan...')
+			# Format the research plan and summaries for the prompt
+			formatted_plan = '\n'.join(
+				f'- {plan_topic.title}\n'
+				+ '\n'.join(f'  - {question}' for question in plan_topic.questions)
+				for plan_topic in research_plan.topics
+			)
+			self.logger.debug('Research plan formatted successfully')
+
+			self.logger.debug('Formatting summaries and citations...')
+			summary_parts: List[str] = []
+			formatted_citations = ''
+			bibliography_entries: List[str] = []
+			# Report-wide citation number of every source, so a source cited by several
+			# summaries is listed once. Citations without a URL are never merged.
+			citation_numbers: Dict[str, int] = {}
+
+			# Fallback access date (YYYY-MM-DD) shared by every citation that doesn't carry its own
+			accessed_date = datetime.now(timezone.utc).date().isoformat()
+
+			for i, summary in enumerate(research_summaries):
+				if not isinstance(summary, dict):
+					raise ReportGeneratorError(f'Invalid summary format at index {i}')
+
+				# Summary citation N is the source the summary text cites as [N]
+				local_numbers: Dict[int, int] = {}
+				for local_number, citation in enumerate(summary.get('citations') or [], start=1):
+					url = citation.get('url')
+					citation_number = citation_numbers.get(url) if url else None
+					if citation_number is None:
+						citation_number = len(bibliography_entries) + 1
+						if url:
+							citation_numbers[url] = citation_number
+
+						# Format the bibliography entry right away, as only its text is needed later
+						title = citation.get('title') or 'Untitled'
+						# YYYY-MM-DD
+						accessed = (citation.get('accessed_date') or accessed_date)[:10]
+						bibliography_entries.append(
+							f'[{citation_number}] {title}. Available at: {url or "No URL available"} '
+							f'(Accessed: {accessed})\n\n'
+						)
+					local_numbers[local_number] = citation_number
+
+				# Renumber the summary's inline markers to the report-wide citation numbers. A marker
+				# without a stored citation would point at another source, so it is dropped.
+				def renumber(match: re.Match) -> str:
+					numbers = (int(number) for number in match.group(1).split(','))
+					report_numbers = dict.fromkeys(local_numbers[n] for n in numbers if n in local_numbers)
+					return '[' + ', '.join(map(str, report_numbers)) + ']' if report_numbers else ''
+
+				summary_text = CITATION_MARKER_PATTERN.sub(
+					renumber, summary.get('summary', 'No summary available')
+				)
+
+				summary_parts.append(
+					f'## Research on: {summary.get("task", "Unknown Task")}\n\n{summary_text}\n\n'
+				)
+
+				# List the sources the summary cites, numbered across the whole report
+				if local_numbers:
+					summary_parts.append(
+						'Sources: '
+						+ ', '.join(f'[{number}]' for number in sorted(set(local_numbers.values())))
+						+ '\n\n'
+					)
+
+			formatted_summaries = ''.join(summary_parts)
+			self.logger.debug(
+				f'Formatted {len(research_summaries)} summaries and {len(bibliography_entries)} citations'
+			)
+
+			if bibliography_entries:
+				formatted_citations = '\n## Bibliography\n\n' + ''.join(bibliography_entries)
+
+			self.logger.debug('Creating prompt...')
+			# Create prompt for the LLM
+			prompt = REPORT_PROMPT.format(
+				topic=topic,
+				formatted_plan=formatted_plan,
+				formatted_summaries=formatted_summaries,
+				formatted_citations=formatted_citations,
+			)
+
+			self.logger.debug(f'Prompt created, length: {len(prompt)} characters')
+			return prompt
+
+		except ReportGeneratorError:
+			raise
+		except Exception as e:
+			self.logger.error(f'Error in formatting data: {str(e)}')
+			raise ReportGeneratorError(f'Error formatting research data: {str(e)}')
+
+	def _build_request(self, prompt: str) -> Dict:
+		"""Build the Responses API arguments for generating the report from the prompt."""
+		return dict(
+			model='gpt-4o-mini',
+			input=[
+				{
+					'role': 'system',
+					'content': [
+						{
+							'type': 'input_text',
+							'text': 'You are a research report writer that creates comprehensive, well-structured reports in Markdown format.',
+						}
+					],
+				},
+				{'role': 'user', 'content': [{'type': 'input_text', 'text': prompt}]},
+			],
+			temperature=0.7,
+			tools=[],
+			store=True,
+		)
+
+	def _api_error(self, e: Exception) -> ReportGeneratorError:
+		"""Translate an exception raised by the OpenAI client into a ReportGeneratorError."""
+		if isinstance(e, openai.RateLimitError):
+			self.logger.error(f'Rate limit error: {str(e)}')
+			return ReportGeneratorError(f'OpenAI API rate limit exceeded: {str(e)}')
+		if isinstance(e, openai.APITimeoutError):
+			self.logger.error(f'Timeout error: {str(e)}')
+			return ReportGeneratorError(f'OpenAI API request timed out: {str(e)}')
+		if isinstance(e, openai.APIConnectionError):
+			self.logger.error(f'Connection error: {str(e)}')
+			return ReportGeneratorError(f'Error connecting to OpenAI API: {str(e)}')
+		if isinstance(e, openai.APIError):
+			self.logger.error(f'OpenAI API error: {str(e)}')
+			return ReportGeneratorError(f'OpenAI API error: {str(e)}')
+		self.logger.error(f'Unexpected API error: {str(e)}')
+		return ReportGeneratorError(f'Error calling OpenAI API: {str(e)}')
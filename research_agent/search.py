@@ -1,16 +1,67 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
+import asyncio
 import logging
-from typing import List, Dict
+import orjson
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
+from research_agent.client import async_client_scope, get_client
 from research_agent.models import SearchAnnotation, SearchResponse, SearchResult, SearchContext
 
+SUMMARIZER_INSTRUCTIONS = 'You are a research assistant that summarizes web search results into clear, concise, and informative summaries with proper citations.'
+
+# Cited snippets are cut off here before they enter a summary prompt
+SNIPPET_MAX_CHARS = 400
+
+# Output token budget of a single summary; batch requests get one budget per question
+SUMMARY_MAX_OUTPUT_TOKENS = 1500
+
+# With this few results, the inline [N] markers are enough and the citation guide is left out
+CITATION_GUIDE_MIN_RESULTS = 4
+
+
+class WebSearchError(Exception):
+	"""Custom exception for WebSearchAgent errors"""
+
+	pass
+
+
+def group_results_by_source(results: List[SearchResult]) -> List[List[SearchResult]]:
+	"""Group search results by the source they cite, in order of each source's first result.
+
+	Source N of the list is the one a summary cites as [N]. Results without a link aren't
+	citations and are never merged.
+	"""
+	results_by_source = {}
+	for result in results:
+		results_by_source.setdefault(result.link or object(), []).append(result)
+	return list(results_by_source.values())
+
+
+def _iter_output_text(response) -> Iterator:
+	"""Yield the output_text content items of the messages in a Responses API response."""
+	for output_item in response.output:
+		if output_item.type == 'message' and hasattr(output_item, 'content'):
+			for content_item in output_item.content:
+				if content_item.type == 'output_text':
+					yield content_item
+
 
 class WebSearchAgent:
 	"""Handles web searches and summarization of search results."""
 
-	def __init__(self):
-		"""Initialize the web search module."""
+	def __init__(self, summary_model: str = 'gpt-4o-mini', reasoning_effort: Optional[str] = None):
+		"""Initialize the web search module.
+
+		Args:
+		    summary_model (str): Model used to summarize search results
+		    reasoning_effort (Optional[str]): Reasoning effort for reasoning models such as
+		        o3-mini. Leave unset for models that don't support reasoning.
+		"""
 		self.logger = logging.getLogger(__name__)
+		self.summary_model = summary_model
+		self.reasoning_effort = reasoning_effort
 
 	def search(self, query: str, api_key: str, context: SearchContext = None) -> SearchResponse:
 		"""Execute a web search for the given query.
@@ -23,29 +74,13 @@ class WebSearchAgent:
 		Returns:
 		    SearchResponse: Object containing search results and metadata
 		"""
-		client = OpenAI(api_key=api_key)
-
-		# Build a contextualized query
-		contextualized_query = query
+		client = get_client(api_key)
 
-		# Enhance query with research topic and theme if available
-		if context:
-			# Add main research topic if available
-			contextualized_query = (
-				f'[Research on: {context.research_topic}] {contextualized_query}'
-			)
-
-			# Add research theme or subtopic if available
-			if context.current_subtopic:
-				contextualized_query = (
-					f'{contextualized_query} [Subtopic: {context.current_subtopic}]'
-				)
+		contextualized_query = self._contextualize_query(query, context)
 
 		# Log the search request with the enhanced query
 		self.logger.debug(f'Executing web search for contextualized query: {contextualized_query}')
 
-		import time
-
 		start_time = time.time()
 
 		# Execute the search using OpenAI's Responses API with web search tool
@@ -59,62 +94,122 @@ class WebSearchAgent:
 		response_time = time.time() - start_time
 		self.logger.info(f'Received search response in {response_time:.2f} seconds')
 
-		# Log detailed response information
-		self.logger.debug('OpenAI API Search Response Details:')
-		self.logger.debug(f'Raw response: {response}')
-		self.logger.debug(f'Response ID: {response.id if hasattr(response, "id") else "N/A"}')
-		self.logger.debug(f'Model used: {response.model if hasattr(response, "model") else "N/A"}')
-		self.logger.debug(
-			f'Response created: {response.created if hasattr(response, "created") else "N/A"}'
-		)
+		return self._build_search_response(response, query, context)
 
-		# Extract the search results
-		search_results = []
+	async def asearch(
+		self,
+		query: str,
+		api_key: str,
+		context: SearchContext = None,
+		client: Optional[AsyncOpenAI] = None,
+	) -> SearchResponse:
+		"""Execute a web search for the given query without blocking the event loop.
 
-		# Process the response to extract search results
-		for output_item in response.output:
-			if output_item.type == 'message' and hasattr(output_item, 'content'):
-				for content_item in output_item.content:
-					if content_item.type == 'output_text' and hasattr(content_item, 'annotations'):
-						# Extract citations as search results
-						for annotation in content_item.annotations:
-							if annotation.type == 'url_citation':
-								# Extract the text that references this citation
-								citation_text = content_item.text[
-									annotation.start_index : annotation.end_index
-								]
-
-								search_results.append(
-									SearchResult(
-										title=annotation.title or 'Web Search Result',
-										link=annotation.url,
-										snippet=citation_text,
-										annotation=SearchAnnotation(
-											start_index=annotation.start_index,
-											end_index=annotation.end_index,
-											type=annotation.type,
-										),
-									)
-								)
+		Args:
+		    query (str): The search query
+		    api_key (str): OpenAI API key
+		    context (SearchContext, optional): Research context for more focused searching
+		    client (AsyncOpenAI, optional): Client shared by concurrent calls. A new one is opened
+		        and closed for this call if not given.
+
+		Returns:
+		    SearchResponse: Object containing search results and metadata
+		"""
+		async with async_client_scope(api_key, client) as client:
+			contextualized_query = self._contextualize_query(query, context)
+
+			self.logger.debug(f'Executing async web search for contextualized query: {contextualized_query}')
+
+			start_time = time.time()
+
+			response = await client.responses.create(
+				model='gpt-4o-mini',
+				tools=[{'type': 'web_search_preview'}],
+				input=f'Search for information about: {contextualized_query}',
+			)
+
+			response_time = time.time() - start_time
+			self.logger.info(f'Received search response in {response_time:.2f} seconds')
+
+			return self._build_search_response(response, query, context)
+
+	def _contextualize_query(self, query: str, context: SearchContext = None) -> str:
+		"""Prefix the query with the research topic and subtopic from the context, if any."""
+		# Build a contextualized query
+		contextualized_query = query
+
+		# Enhance query with research topic and theme if available
+		if context:
+			# Add main research topic if available
+			contextualized_query = (
+				f'[Research on: {context.research_topic}] {contextualized_query}'
+			)
+
+			# Add research theme or subtopic if available
+			if context.current_subtopic:
+				contextualized_query = (
+					f'{contextualized_query} [Subtopic: {context.current_subtopic}]'
+				)
+
+		return contextualized_query
+
+	def _build_search_response(
+		self, response, query: str, context: SearchContext = None
+	) -> SearchResponse:
+		"""Extract search results from a web search API response."""
+		# Log detailed response information, formatting it only when it will be emitted
+		if self.logger.isEnabledFor(logging.DEBUG):
+			self.logger.debug('OpenAI API Search Response Details:')
+			self.logger.debug(f'Raw response: {response}')
+			self.logger.debug(f'Response ID: {getattr(response, "id", "N/A")}')
+			self.logger.debug(f'Model used: {getattr(response, "model", "N/A")}')
+			self.logger.debug(f'Response created: {getattr(response, "created", "N/A")}')
+
+		# Extract the search results, all accessed at the same moment
+		search_results = []
+		accessed_date = datetime.now(timezone.utc)
+
+		# Process the response to extract search results, walking its output only once
+		text_items = list(_iter_output_text(response))
+		for content_item in text_items:
+			# Extract citations as search results
+			for annotation in getattr(content_item, 'annotations', None) or ():
+				if annotation.type == 'url_citation':
+					# Extract the text that references this citation
+					citation_text = content_item.text[annotation.start_index : annotation.end_index]
+
+					# The fields come straight from the typed API response, so skip re-validating them
+					search_results.append(
+						SearchResult.model_construct(
+							title=annotation.title or 'Web Search Result',
+							link=annotation.url,
+							snippet=citation_text,
+							accessed_date=accessed_date,
+							annotation=SearchAnnotation.model_construct(
+								start_index=annotation.start_index,
+								end_index=annotation.end_index,
+								type=annotation.type,
+							),
+						)
+					)
 
 		# If no search results were found in annotations, create a generic one
-		if not search_results and response.output:
-			for output_item in response.output:
-				if output_item.type == 'message' and hasattr(output_item, 'content'):
-					for content_item in output_item.content:
-						if content_item.type == 'output_text':
-							search_results.append(
-								SearchResult(
-									title='OpenAI Web Search Result',
-									link='',
-									snippet=content_item.text,
-								)
-							)
+		if not search_results:
+			for content_item in text_items:
+				search_results.append(
+					SearchResult.model_construct(
+						title='OpenAI Web Search Result',
+						link='',
+						snippet=content_item.text,
+						accessed_date=accessed_date,
+					)
+				)
 
 		return SearchResponse(
 			query=query,
 			results=search_results,
 			context=context,
+			timestamp=accessed_date,
 		)
 
 	def summarize(
@@ -135,63 +230,243 @@ class WebSearchAgent:
 		Returns:
 		    str: A summary text
 		"""
-		# Initialize the OpenAI client
-		client = OpenAI(api_key=api_key)
-
-		# Format the search results for the prompt
-		formatted_results = ''
-		# Create a citation mapping for reference
-		citation_references = {}
-		# Import datetime here to avoid potential issues
-		from datetime import datetime
-
-		for i, result in enumerate(search_results):
-			# Create a citation reference number for this result
-			citation_num = i + 1
-			citation_key = f'[{citation_num}]'
-
-			# Store the citation information
-			citation_references[citation_key] = {
-				'title': result.title,
-				'url': result.link,
-				'snippet': result.snippet,
-				'accessed_date': result.accessed_date,
-			}
-
-			# Format the result for the prompt
-			formatted_results += f'Result {citation_num} {citation_key}:\n'
-			formatted_results += f'Title: {result.title}\n'
-			formatted_results += f'URL: {result.link}\n'
-			formatted_results += f'Snippet: {result.snippet}\n\n'
+		# Get the shared OpenAI client for the API key
+		client = get_client(api_key)
 
-		# Add context to summarization prompt if available
-		context_prompt = ''
+		# Call the OpenAI API using the responses endpoint
+		response = client.responses.create(
+			**self._build_summary_request(search_results, query, context)
+		)
 
-		# Use the provided SearchContext
-		search_context = context
+		return self._extract_summary(response)
 
-		if search_context:
-			context_elements = []
+	async def asummarize(
+		self,
+		search_results: List[SearchResult],
+		query: str,
+		api_key: str,
+		context: SearchContext = None,
+		client: Optional[AsyncOpenAI] = None,
+	) -> str:
+		"""Summarize search results without blocking the event loop.
 
-			# Add main research topic context
-			context_elements.append(f'Main research topic: {search_context.research_topic}')
+		Args:
+		    search_results (list): List of search results
+		    query (str): The original query
+		    api_key (str): OpenAI API key
+		    context (SearchContext, optional): Research context for better summarization
+		    client (AsyncOpenAI, optional): Client shared by concurrent calls. A new one is opened
+		        and closed for this call if not given.
 
-			# Add current subtopic or theme context if available
-			if search_context.current_subtopic:
-				context_elements.append(f'Current subtopic: {search_context.current_subtopic}')
+		Returns:
+		    str: A summary text
 
-			# Add iteration information if available
-			if search_context.iteration is not None:
-				context_elements.append(f'Research iteration: {search_context.iteration + 1}')
+		Raises:
+		    WebSearchError: If the response contains no summary text
+		"""
+		async with async_client_scope(api_key, client) as client:
+			response = await client.responses.create(
+				**self._build_summary_request(search_results, query, context)
+			)
 
-			# Combine all context elements
-			if context_elements:
-				context_prompt = '\nResearch Context:\n- ' + '\n- '.join(context_elements)
+		summary = self._extract_summary(response)
+		if not summary:
+			raise WebSearchError(f'Summary for query {query!r} is empty')
+		return summary
 
-		# Create a formatted citation guide
-		citation_guide = '\n\nCitations:\n'
-		for key, citation in citation_references.items():
-			citation_guide += f'{key} {citation["title"]}. {citation["url"]}\n'
+	async def astream_summarize(
+		self,
+		search_results: List[SearchResult],
+		query: str,
+		api_key: str,
+		context: SearchContext = None,
+		client: Optional[AsyncOpenAI] = None,
+	) -> AsyncIterator[str]:
+		"""Summarize search results, yielding the summary text as it is generated.
+
+		Args:
+		    search_results (list): List of search results
+		    query (str): The original query
+		    api_key (str): OpenAI API key
+		    context (SearchContext, optional): Research context for better summarization
+		    client (AsyncOpenAI, optional): Client shared by concurrent calls. A new one is opened
+		        and closed for this call if not given.
+
+		Yields:
+		    str: The next chunk of the markdown summary
+
+		Raises:
+		    WebSearchError: If the stream fails, stops early or produces no summary text
+		"""
+		async with async_client_scope(api_key, client) as client:
+			stream = await client.responses.create(
+				**self._build_summary_request(search_results, query, context), stream=True
+			)
+
+			has_text = False
+			async for event in stream:
+				if event.type == 'response.output_text.delta':
+					has_text = has_text or bool(event.delta.strip())
+					yield event.delta
+				elif event.type == 'response.failed' and event.response.error:
+					error = event.response.error
+					raise WebSearchError(f'API Error ({error.code}): {error.message}')
+				elif event.type == 'response.incomplete':
+					details = event.response.incomplete_details
+					reason = details.reason if details else 'unknown'
+					raise WebSearchError(f'Summary stream stopped early ({reason})')
+				elif event.type == 'error':
+					raise WebSearchError(f'API Error ({event.code}): {event.message}')
+
+			if not has_text:
+				raise WebSearchError(f'Summary for query {query!r} is empty')
+
+	async def abatch_summarize(
+		self,
+		batch: List[Tuple[List[SearchResult], str, SearchContext]],
+		api_key: str,
+		client: Optional[AsyncOpenAI] = None,
+	) -> List[str]:
+		"""Summarize the search results of several questions with a single API call.
+
+		Args:
+		    batch (list): (search_results, query, context) tuples, one per question
+		    api_key (str): OpenAI API key
+		    client (AsyncOpenAI, optional): Client shared by concurrent calls. A new one is opened
+		        and closed for this call if not given.
+
+		Returns:
+		    list: One summary text per question, in the same order as the batch
+
+		Raises:
+		    WebSearchError: If a question left out of the batch still gets no summary text
+		"""
+		# Give every question its own block of numbered search results
+		block_parts: List[str] = []
+		for i, (search_results, query, context) in enumerate(batch):
+			formatted_results, citation_guide = self._format_search_results(search_results)
+			block_parts.append(f"""
+        Question {i + 1}: '{query}'{self._format_context(context)}
+        
+        {formatted_results}{citation_guide}
+        """)
+		question_blocks = ''.join(block_parts)
+
+		input_text = f"""I'm researching {len(batch)} questions. Each question below comes with its own search results.
+        {question_blocks}
+        For every question, provide a comprehensive summary of the key information from its own search results that's relevant to that question. 
+        Include important facts, definitions, and insights. 
+        Organize the information logically and make it easy to understand.
+        If there are conflicting viewpoints, please note them.
+        
+        IMPORTANT: When referencing information from the search results, include the citation number in square brackets [X] after the relevant information, using the numbering of that question's own results. 
+        
+        Each summary should be in Markdown format and include a bibliography section at the end listing the sources it used.
+        Return one summary per question, identified by its question number.
+        """
+
+		self.logger.debug(f'Summarizing {len(batch)} questions in one batch request')
+
+		async with async_client_scope(api_key, client) as client:
+			response = await client.responses.create(
+				**self._summary_model_options(SUMMARY_MAX_OUTPUT_TOKENS * len(batch)),
+				input=[
+					{
+						'role': 'developer',
+						'content': [{'type': 'input_text', 'text': SUMMARIZER_INSTRUCTIONS}],
+					},
+					{'role': 'user', 'content': [{'type': 'input_text', 'text': input_text}]},
+				],
+				text={
+					'format': {
+						'type': 'json_schema',
+						'name': 'batch_summaries',
+						'strict': True,
+						'schema': {
+							'type': 'object',
+							'properties': {
+								'summaries': {
+									'type': 'array',
+									'description': 'One summary per question',
+									'items': {
+										'type': 'object',
+										'properties': {
+											'question_id': {
+												'type': 'integer',
+												'description': 'The number of the question being summarized',
+											},
+											'summary': {
+												'type': 'string',
+												'description': 'The Markdown summary for the question',
+											},
+										},
+										'required': ['question_id', 'summary'],
+										'additionalProperties': False,
+									},
+								}
+							},
+							'required': ['summaries'],
+							'additionalProperties': False,
+						},
+					}
+				},
+				tools=[],
+				store=True,
+			)
+
+			if self.logger.isEnabledFor(logging.DEBUG):
+				self.logger.debug(f'Raw batch summary response: {response}')
+
+			# Fan the summaries back out to their questions
+			summaries = [''] * len(batch)
+			for item in orjson.loads(response.output_text)['summaries']:
+				if 1 <= item['question_id'] <= len(batch):
+					summaries[item['question_id'] - 1] = item['summary'].strip()
+
+			# Summarize the questions the model left out, or left empty, one by one
+			missing = [i for i, summary in enumerate(summaries) if not summary]
+			if missing:
+				self.logger.warning(
+					f'Batch summary is missing {len(missing)} of {len(batch)} questions, summarizing them separately'
+				)
+				fallbacks = await asyncio.gather(
+					*(
+						self.asummarize(batch[i][0], batch[i][1], api_key, context=batch[i][2], client=client)
+						for i in missing
+					)
+				)
+				for i, summary in zip(missing, fallbacks):
+					summaries[i] = summary
+
+		return summaries
+
+	def embed(self, texts: List[str], api_key: str) -> List[List[float]]:
+		"""Embed texts for semantic similarity comparisons.
+
+		Args:
+		    texts (list): The texts to embed
+		    api_key (str): OpenAI API key
+
+		Returns:
+		    list: One unit-length embedding vector per text, in the same order
+		"""
+		client = get_client(api_key)
+
+		self.logger.debug(f'Embedding {len(texts)} texts')
+
+		response = client.embeddings.create(model='text-embedding-3-small', input=texts)
+
+		return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+	def _build_summary_request(
+		self,
+		search_results: List[SearchResult],
+		query: str,
+		context: SearchContext = None,
+	) -> Dict:
+		"""Build the Responses API arguments for summarizing search results."""
+		formatted_results, citation_guide = self._format_search_results(search_results)
+		context_prompt = self._format_context(context)
 
 		# Create input text for the response API with explicit citation instructions
 		input_text = f"""I'm researching the following topic: '{query}'
@@ -213,72 +488,95 @@ class WebSearchAgent:
         {citation_guide}
         """
 
-		# Call the OpenAI API using the responses endpoint
-		response = client.responses.create(
-			model='o3-mini',
+		return dict(
+			**self._summary_model_options(SUMMARY_MAX_OUTPUT_TOKENS),
 			input=[
 				{
 					'role': 'developer',
-					'content': [
-						{
-							'type': 'input_text',
-							'text': 'You are a research assistant that summarizes web search results into clear, concise, and informative summaries with proper citations.',
-						}
-					],
+					'content': [{'type': 'input_text', 'text': SUMMARIZER_INSTRUCTIONS}],
 				},
 				{'role': 'user', 'content': [{'type': 'input_text', 'text': input_text}]},
 			],
 			text={'format': {'type': 'text'}},
-			reasoning={'effort': 'medium'},
 			tools=[],
 			store=True,
 		)
 
-		# Log response details
-		self.logger.debug('OpenAI API Response Details:')
-		self.logger.debug(f'Raw response: {response}')
-		self.logger.debug(f'Response ID: {response.id if hasattr(response, "id") else "N/A"}')
-		self.logger.debug(f'Model used: {response.model if hasattr(response, "model") else "N/A"}')
+	def _summary_model_options(self, max_output_tokens: int) -> Dict:
+		"""Build the model arguments shared by every summarization request."""
+		options = dict(model=self.summary_model, max_output_tokens=max_output_tokens)
+		if self.reasoning_effort:
+			options['reasoning'] = {'effort': self.reasoning_effort}
+		return options
+
+	def _format_search_results(self, search_results: List[SearchResult]) -> Tuple[str, str]:
+		"""Format search results as numbered prompt entries plus a matching citation guide."""
+		sources = group_results_by_source(search_results)
+
+		# Format the search results for the prompt, numbering each source for citation
+		result_parts: List[str] = []
+		for citation_num, source_results in enumerate(sources, start=1):
+			result = source_results[0]
+			snippet = ' ... '.join(r.snippet for r in source_results)
+			# Cap cited snippets; an uncited result carries the whole search answer
+			if result.link:
+				snippet = snippet[:SNIPPET_MAX_CHARS]
+
+			result_parts.append(
+				f'Result {citation_num} [{citation_num}]:\n'
+				f'Title: {result.title}\n'
+				f'URL: {result.link}\n'
+				f'Snippet: {snippet}\n\n'
+			)
+
+		# Create a formatted citation guide, unless there are too few results to need one
+		citation_guide = ''
+		if len(sources) >= CITATION_GUIDE_MIN_RESULTS:
+			citation_guide = '\n\nCitations:\n' + ''.join(
+				f'[{citation_num}] {source_results[0].title}. {source_results[0].link}\n'
+				for citation_num, source_results in enumerate(sources, start=1)
+			)
+
+		return ''.join(result_parts), citation_guide
+
+	def _format_context(self, context: SearchContext = None) -> str:
+		"""Format the research context as a bulleted prompt section, or '' without context."""
+		# Add context to summarization prompt if available
+		context_prompt = ''
+
+		# Use the provided SearchContext
+		search_context = context
+
+		if search_context:
+			context_elements = []
+
+			# Add main research topic context
+			context_elements.append(f'Main research topic: {search_context.research_topic}')
+
+			# Add current subtopic or theme context if available
+			if search_context.current_subtopic:
+				context_elements.append(f'Current subtopic: {search_context.current_subtopic}')
+
+			# Add iteration information if available
+			if search_context.iteration is not None:
+				context_elements.append(f'Research iteration: {search_context.iteration + 1}')
+
+			# Combine all context elements
+			if context_elements:
+				context_prompt = '\nResearch Context:\n- ' + '\n- '.join(context_elements)
+
+		return context_prompt
 
-		# Extract the summary from the response
-		summary = ''
+	def _extract_summary(self, response) -> str:
+		"""Extract the markdown summary text from a summarization API response."""
+		# Log response details, formatting them only when they will be emitted
+		if self.logger.isEnabledFor(logging.DEBUG):
+			self.logger.debug('OpenAI API Response Details:')
+			self.logger.debug(f'Raw response: {response}')
+			self.logger.debug(f'Response ID: {getattr(response, "id", "N/A")}')
+			self.logger.debug(f'Model used: {getattr(response, "model", "N/A")}')
 
 		# Extract the markdown text from the response
-		for output_item in response.output:
-			if output_item.type == 'message' and hasattr(output_item, 'content'):
-				for content_item in output_item.content:
-					if content_item.type == 'output_text':
-						summary += content_item.text
-
-		# # Process the summary to extract citation references
-		# # Look for citation patterns like [1], [2], etc.
-		# import re
-		# citation_pattern = r'\[(\d+)\]'
-		# citation_matches = re.finditer(citation_pattern, summary)
-
-		# # Create annotations from the citation references
-		# for match in citation_matches:
-		# 	citation_num = int(match.group(1))
-		# 	citation_key = f'[{citation_num}]'
-
-		# 	# Find the corresponding citation in our references
-		# 	if citation_num <= len(search_results):
-		# 		result = search_results[citation_num - 1]
-
-		# 		# Create an annotation for this citation
-		# 		annotations.append({
-		# 			'id': f'citation_{citation_num}',
-		# 			'title': result.get('title', 'Web Search Result'),
-		# 			'url': result.get('link', ''),
-		# 			'snippet': result.get('snippet', ''),
-		# 			'accessed_date': result.get('accessed_date', datetime.now()),
-		# 			# We don't have exact positions in the text, but we have the citation marker
-		# 			'annotation': {
-		# 				'start_index': match.start(),
-		# 				'end_index': match.end(),
-		# 				'type': 'citation',
-		# 			},
-		# 		})
-
-		# Return both the summary and the annotations
+		summary = ''.join(content_item.text for content_item in _iter_output_text(response))
+
 		return summary.strip()
@@ -1,8 +1,10 @@
-from openai import OpenAI
 import logging
-import json
+import orjson
+import re
+import time
 from typing import Optional
 from pydantic import BaseModel
+from .client import get_client
 
 
 class TriageDecision(BaseModel):
@@ -21,6 +23,52 @@ class TriageAgentError(Exception):
 	pass
 
 
+# Earlier messages shown in the triage prompt; the opening request is always kept
+MAX_HISTORY_MESSAGES = 8
+
+# Greetings and small talk that are never research requests
+SMALL_TALK_PATTERN = re.compile(
+	r"(hi|hello|hey|thanks|thank you|lol|tell me a joke|what'?s the weather( today)?)[\s!.?]*",
+	re.IGNORECASE,
+)
+
+# Queries that are exactly "The impact of X on Y" or "History of X in Y" name a clear research
+# subject. The whole query must match, so a request that only mentions such a phrase goes to the model.
+RESEARCH_TOPIC_PATTERN = re.compile(
+	r'(the\s+)?(impact|history|evolution|analysis) of \S.* (on|in) \S.*', re.IGNORECASE
+)
+
+
+# Prompt for triaging a query, with the earlier conversation
+TRIAGE_PROMPT = """I am a research agent that helps users create comprehensive research reports on various topics.
+            
+            {formatted_history}
+            
+            The user has just sent this query: "{query}"
+            
+            Evaluate whether this query is:
+            1. A valid research topic that I can create a report on
+            2. An invalid request (not asking for research or a report)
+            3. A request that needs clarification before I can proceed
+            
+            A valid research topic should be a clear subject that can be researched to create a comprehensive report.
+            Examples of valid topics: "The impact of artificial intelligence on healthcare", "History and evolution of renewable energy"
+            
+            An invalid request might be a command, a question unrelated to research, or something that doesn't make sense.
+            Examples of invalid requests: "What's the weather today?", "Tell me a joke", "Send an email to John"
+            
+            A request needing clarification might be too vague, too broad, or ambiguous.
+            Examples: "AI", "Tell me about science", "Research this topic"
+            
+            Please provide your assessment in the following JSON format:
+            {{
+                "status": "valid" or "invalid" or "needs_clarification",
+                "reasoning": "Your detailed explanation of why the query falls into this category",
+                "clarification_question": "If status is 'needs_clarification', provide a specific question to ask the user to clarify their request"
+            }}
+            """
+
+
 class TriageAgent:
 	"""Evaluates user queries to determine if they're valid research requests."""
 
@@ -52,8 +100,8 @@ class TriageAgent:
 			if not query:
 				raise TriageAgentError('User query is required')
 
-			# Initialize the OpenAI client with the API key
-			client = OpenAI(api_key=api_key)
+			# Get the shared OpenAI client for the API key
+			client = get_client(api_key)
 
 			self.logger.debug(f'Triaging query: {query}')
 
@@ -64,51 +112,26 @@ class TriageAgent:
 			# Add the current query to the conversation history
 			self.conversation_history.append({'role': 'user', 'content': query})
 
+			# Obvious new queries are decided locally, without an API call
+			if len(self.conversation_history) == 1:
+				decision = self._fast_triage(query)
+				if decision:
+					self.logger.info(
+						f'Triage Decision (local): {decision.status}, Reasoning: {decision.reasoning}'
+					)
+					return decision
+
 			# Format the conversation history for the prompt
-			formatted_history = ''
-			if len(self.conversation_history) > 1:  # If there's more than just the current query
-				for i, message in enumerate(
-					self.conversation_history[:-1]
-				):  # Exclude the current query
-					role = 'User' if message['role'] == 'user' else 'Assistant'
-					formatted_history += f'{role}: {message["content"]}\n\n'
+			formatted_history = self._format_history(self.conversation_history[:-1])
 
 			# Create a prompt for the LLM
-			prompt = f"""I am a research agent that helps users create comprehensive research reports on various topics.
-            
-            {formatted_history if formatted_history else ''}
-            
-            The user has just sent this query: "{query}"
-            
-            Evaluate whether this query is:
-            1. A valid research topic that I can create a report on
-            2. An invalid request (not asking for research or a report)
-            3. A request that needs clarification before I can proceed
-            
-            A valid research topic should be a clear subject that can be researched to create a comprehensive report.
-            Examples of valid topics: "The impact of artificial intelligence on healthcare", "History and evolution of renewable energy"
-            
-            An invalid request might be a command, a question unrelated to research, or something that doesn't make sense.
-            Examples of invalid requests: "What's the weather today?", "Tell me a joke", "Send an email to John"
-            
-            A request needing clarification might be too vague, too broad, or ambiguous.
-            Examples: "AI", "Tell me about science", "Research this topic"
-            
-            Please provide your assessment in the following JSON format:
-            {{
-                "status": "valid" or "invalid" or "needs_clarification",
-                "reasoning": "Your detailed explanation of why the query falls into this category",
-                "clarification_question": "If status is 'needs_clarification', provide a specific question to ask the user to clarify their request"
-            }}
-            """
+			prompt = TRIAGE_PROMPT.format(formatted_history=formatted_history, query=query)
 
 			# Log the request
 			self.logger.debug(
 				f'Sending request to OpenAI API with prompt length: {len(prompt)} characters'
 			)
 
-			import time
-
 			start_time = time.time()
 
 			try:
@@ -154,9 +177,11 @@ class TriageAgent:
 			response_time = time.time() - start_time
 			self.logger.info(f'Received triage response in {response_time:.2f} seconds')
 
-			# Log detailed response information
-			self.logger.debug('OpenAI API Response Details:')
-			self.logger.debug(f'Raw response: {response}')
+			# Log detailed response information, formatting it only when it will be emitted
+			debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+			if debug_enabled:
+				self.logger.debug('OpenAI API Response Details:')
+				self.logger.debug(f'Raw response: {response}')
 
 			# Check for API errors in the response
 			if response.error:
@@ -166,8 +191,9 @@ class TriageAgent:
 
 			try:
 				# Extract the decision from the response
-				json_response = json.loads(response.output_text)
-				self.logger.debug(f'Response JSON: {json_response}')
+				json_response = orjson.loads(response.output_text)
+				if debug_enabled:
+					self.logger.debug(f'Response JSON: {json_response}')
 
 				# Create and return a TriageDecision object
 				decision = TriageDecision(
@@ -187,7 +213,7 @@ class TriageAgent:
 				)
 				return decision
 
-			except json.JSONDecodeError as e:
+			except orjson.JSONDecodeError as e:
 				error_msg = f'Failed to parse API response as JSON: {str(e)}'
 				self.logger.error(error_msg)
 				raise TriageAgentError(error_msg)
@@ -204,3 +230,47 @@ class TriageAgent:
 			error_msg = f'Unexpected error in triage agent: {str(e)}'
 			self.logger.error(error_msg)
 			raise TriageAgentError(error_msg)
+
+	def _format_history(self, history: list) -> str:
+		"""Format earlier conversation messages for the prompt, keeping at most MAX_HISTORY_MESSAGES.
+
+		The opening request names the topic and the latest messages hold the current clarification,
+		so the messages in between are the ones left out of a long conversation.
+		"""
+		omitted_note = ''
+		if len(history) > MAX_HISTORY_MESSAGES:
+			omitted = len(history) - MAX_HISTORY_MESSAGES
+			omitted_note = f'({omitted} earlier messages omitted)\n\n'
+			history = history[:1] + history[omitted + 1 :]
+
+		lines = [
+			f'{"User" if message["role"] == "user" else "Assistant"}: {message["content"]}\n\n'
+			for message in history
+		]
+		# The note stands where the omitted messages were, after the opening request
+		return ''.join(lines[:1]) + omitted_note + ''.join(lines[1:])
+
+	def _fast_triage(self, query: str) -> Optional[TriageDecision]:
+		"""Classify queries that are obviously valid or invalid without calling the API.
+
+		Short queries such as "AI" are left to the model, since they can still name a research topic.
+
+		Args:
+		    query (str): The user's query or request
+
+		Returns:
+		    Optional[TriageDecision]: The decision, or None if the query needs the model
+		"""
+		stripped_query = query.strip()
+
+		if SMALL_TALK_PATTERN.fullmatch(stripped_query):
+			return TriageDecision(
+				status='invalid', reasoning='The query is small talk rather than a research request.'
+			)
+
+		if RESEARCH_TOPIC_PATTERN.fullmatch(stripped_query):
+			return TriageDecision(
+				status='valid', reasoning='The query names a clear subject and scope to research.'
+			)
+
+		return None